@@ -5,6 +5,7 @@ import streamlit as st
 import logging
 from ui.main_page import render_main_page
 from config import setup_config
+from services.question_service import start_question_buffer, warm_up_topic_embeddings
 from utils.env_utils import load_environment
 
 # Configure logging
@@ -22,6 +23,11 @@ def main():
     # Setup configuration (page, paths, etc.)
     setup_config()
     
+    # Embed the configured topics and start the question buffer, which
+    # pre-generates questions for the topics learners request, once per process
+    warm_up_topic_embeddings()
+    start_question_buffer()
+    
     # Render the main application
     render_main_page()
 
@@ -0,0 +1,51 @@
+import io
+import os
+import subprocess
+import wave
+import numpy as np
+from typing import List
+
+# Sample rate requested from TTS, every segment and silence uses it
+SAMPLE_RATE = 24000
+
+def decode_wav(data: bytes, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode mono 16-bit WAV bytes, as returned for LINEAR16 synthesis, into samples"""
+    with wave.open(io.BytesIO(data), 'rb') as wav:
+        if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError(
+                f"Expected mono 16-bit audio, got {wav.getnchannels()} channel(s) of {wav.getsampwidth() * 8} bits"
+            )
+        if wav.getframerate() != sample_rate:
+            raise ValueError(f"Expected {sample_rate} Hz audio, got {wav.getframerate()} Hz")
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2')
+
+def silence(duration_ms: int, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Samples for a pause of the given length"""
+    return np.zeros(sample_rate * duration_ms // 1000, dtype=np.int16)
+
+def concatenate(segments: List[np.ndarray]) -> np.ndarray:
+    """Join segments into one buffer, allocated once"""
+    if not segments:
+        return np.zeros(0, dtype=np.int16)
+    return np.concatenate(segments).astype('<i2', copy=False)
+
+def write_audio(samples: np.ndarray, output_file: str, sample_rate: int = SAMPLE_RATE, bitrate: str = "64k"):
+    """Write samples to output_file, in the format given by its extension
+
+    WAV is written directly. Any other format is produced by a single ffmpeg
+    pass reading the raw samples from a pipe.
+    """
+    samples = np.ascontiguousarray(samples, dtype='<i2')
+    if os.path.splitext(output_file)[1].lower() == '.wav':
+        with wave.open(output_file, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes(samples.tobytes())
+        return
+
+    subprocess.run([
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-f', 's16le', '-ar', str(sample_rate), '-ac', '1', '-i', 'pipe:0',
+        '-b:a', bitrate, output_file
+    ], input=samples.tobytes(), check=True)
@@ -1,12 +1,19 @@
 import boto3
 import json
 import os
-from typing import Dict, List, Tuple
-import tempfile
-import subprocess
+import numpy as np
+from backend.audio_assembly import SAMPLE_RATE, concatenate, decode_wav, silence, write_audio
+from backend.llm_cache import converse_cached
+from backend.tts_cache import get_tts_cache
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from datetime import datetime
 from google.cloud import texttospeech
 
+# Synthesis settings shared by every segment, part of the segment cache key
+LANGUAGE_CODE = "hi-IN"  # Hindi works for Marathi
+SPEAKING_RATE = 0.95  # Slightly slower for better comprehension
+
 class AudioGenerator:
     def __init__(self):
         # AWS clients for Bedrock (keeping this part)
@@ -30,28 +37,33 @@ class AudioGenerator:
             "frontend/static/audio"
         )
         os.makedirs(self.audio_dir, exist_ok=True)
-
-    def _invoke_bedrock(self, prompt: str) -> str:
-        """Invoke Bedrock with the given prompt using converse API"""
-        messages = [{
-            "role": "user",
-            "content": [{
-                "text": prompt
-            }]
-        }]
         
+        # Conversation parts synthesized at the same time
+        self.tts_workers = max(1, int(os.environ.get("TTS_MAX_WORKERS", 4)))
+        
+        # Extension of the assembled file: mp3 is encoded by one ffmpeg pass,
+        # wav is written without any subprocess
+        self.output_format = os.environ.get("AUDIO_OUTPUT_FORMAT", "mp3")
+
+    def _invoke_bedrock(self, prompt: str, validate: Optional[Callable[[str], bool]] = None) -> str:
+        """Invoke Bedrock with the given prompt using converse API
+
+        The same question always formats the same way, so responses are
+        served from the shared response cache when possible. Only responses
+        accepted by validate are cached.
+        """
         try:
-            response = self.bedrock.converse(
-                modelId=self.model_id,
-                messages=messages,
-                inferenceConfig={
+            return converse_cached(
+                self.bedrock,
+                self.model_id,
+                prompt,
+                {
                     "temperature": 0.3,
                     "topP": 0.95,
                     "maxTokens": 2000,
-                }
-                
+                },
+                validate=validate
             )
-            return response['output']['message']['content'][0]['text']
         except Exception as e:
             print(f"Error in Bedrock converse: {str(e)}")
             raise e
@@ -89,6 +101,78 @@ class AudioGenerator:
         
         return True
 
+    def _parse_script(self, response: str) -> List[Tuple[str, str, str]]:
+        """Parse a formatted audio script into (speaker, text, gender) parts
+
+        Raises on a speaker line without a valid gender.
+        """
+        # Parse the response into speaker parts
+        parts = []
+        current_speaker = None
+        current_gender = None
+        current_text = None
+        
+        # Track speakers to maintain consistent gender
+        speaker_genders = {}
+        
+        for line in response.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+                
+            if line.startswith('Speaker:'):
+                # Save previous speaker's part if exists
+                if current_speaker and current_text:
+                    parts.append((current_speaker, current_text, current_gender))
+                
+                # Parse new speaker and gender
+                try:
+                    speaker_part = line.split('Speaker:')[1].strip()
+                    current_speaker = speaker_part.split('(')[0].strip()
+                    gender_part = speaker_part.split('Gender:')[1].split(')')[0].strip().lower()
+                    
+                    # Normalize gender
+                    if 'male' in gender_part and not 'female' in gender_part:
+                        current_gender = 'male'
+                    elif 'female' in gender_part:
+                        current_gender = 'female'
+                    else:
+                        raise ValueError(f"Invalid gender format: {gender_part}")
+                    
+                    # Check for gender consistency
+                    if current_speaker in speaker_genders:
+                        if current_gender != speaker_genders[current_speaker]:
+                            print(f"Warning: Gender mismatch for {current_speaker}. Using previously assigned gender {speaker_genders[current_speaker]}")
+                        current_gender = speaker_genders[current_speaker]
+                    else:
+                        speaker_genders[current_speaker] = current_gender
+                except Exception as e:
+                    print(f"Error parsing speaker/gender: {line}")
+                    raise e
+                    
+            elif line.startswith('Text:'):
+                current_text = line.split('Text:')[1].strip()
+                
+            elif line == '---' and current_speaker and current_text:
+                parts.append((current_speaker, current_text, current_gender))
+                current_speaker = None
+                current_gender = None
+                current_text = None
+        
+        # Add final part if exists
+        if current_speaker and current_text:
+            parts.append((current_speaker, current_text, current_gender))
+        
+        return parts
+
+    def _is_valid_script(self, response: str) -> bool:
+        """True for a script that parses into valid conversation parts"""
+        try:
+            parts = self._parse_script(response)
+        except Exception:
+            return False
+        return self.validate_conversation_parts(parts)
+
     def parse_conversation(self, question: Dict) -> List[Tuple[str, str, str]]:
         """
         Convert question into a format for audio generation.
@@ -132,64 +216,9 @@ class AudioGenerator:
                 Make sure to specify gender EXACTLY as shown in the example.
                 """
                 
-                response = self._invoke_bedrock(prompt)
-                
-                # Parse the response into speaker parts
-                parts = []
-                current_speaker = None
-                current_gender = None
-                current_text = None
-                
-                # Track speakers to maintain consistent gender
-                speaker_genders = {}
-                
-                for line in response.split('\n'):
-                    line = line.strip()
-                    if not line:
-                        continue
-                        
-                    if line.startswith('Speaker:'):
-                        # Save previous speaker's part if exists
-                        if current_speaker and current_text:
-                            parts.append((current_speaker, current_text, current_gender))
-                        
-                        # Parse new speaker and gender
-                        try:
-                            speaker_part = line.split('Speaker:')[1].strip()
-                            current_speaker = speaker_part.split('(')[0].strip()
-                            gender_part = speaker_part.split('Gender:')[1].split(')')[0].strip().lower()
-                            
-                            # Normalize gender
-                            if 'male' in gender_part and not 'female' in gender_part:
-                                current_gender = 'male'
-                            elif 'female' in gender_part:
-                                current_gender = 'female'
-                            else:
-                                raise ValueError(f"Invalid gender format: {gender_part}")
-                            
-                            # Check for gender consistency
-                            if current_speaker in speaker_genders:
-                                if current_gender != speaker_genders[current_speaker]:
-                                    print(f"Warning: Gender mismatch for {current_speaker}. Using previously assigned gender {speaker_genders[current_speaker]}")
-                                current_gender = speaker_genders[current_speaker]
-                            else:
-                                speaker_genders[current_speaker] = current_gender
-                        except Exception as e:
-                            print(f"Error parsing speaker/gender: {line}")
-                            raise e
-                            
-                    elif line.startswith('Text:'):
-                        current_text = line.split('Text:')[1].strip()
-                        
-                    elif line == '---' and current_speaker and current_text:
-                        parts.append((current_speaker, current_text, current_gender))
-                        current_speaker = None
-                        current_gender = None
-                        current_text = None
-                
-                # Add final part if exists
-                if current_speaker and current_text:
-                    parts.append((current_speaker, current_text, current_gender))
+                # A script that does not parse is not cached, so a retry asks again
+                response = self._invoke_bedrock(prompt, validate=self._is_valid_script)
+                parts = self._parse_script(response)
                 
                 # Validate the parsed parts
                 if self.validate_conversation_parts(parts):
@@ -208,112 +237,71 @@ class AudioGenerator:
         """Get an appropriate voice config for the given gender"""
         return self.voices[gender] if gender in self.voices else self.voices['announcer']
 
-    def generate_audio_part(self, text: str, voice_config: Dict) -> str:
-        """Generate audio for a single part using Google Text-to-Speech"""
-        try:
-            # Set the text input to be synthesized
-            synthesis_input = texttospeech.SynthesisInput(text=text)
-            
-            # Build the voice request
-            voice = texttospeech.VoiceSelectionParams(
-                language_code="hi-IN",  # Hindi works for Marathi
-                name=voice_config['name'],
-                ssml_gender=voice_config['gender']
-            )
-            
-            # Select the type of audio file
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3,
-                speaking_rate=0.95  # Slightly slower for better comprehension
-            )
-            
-            # Perform the text-to-speech request
-            response = self.tts_client.synthesize_speech(
-                input=synthesis_input, 
-                voice=voice, 
-                audio_config=audio_config
-            )
-            
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_file:
-                temp_file.write(response.audio_content)
-                return temp_file.name
-                
-        except Exception as e:
-            print(f"Error generating audio with Google TTS: {str(e)}")
-            raise e
+    def synthesize_segment(self, text: str, voice_config: Dict) -> bytes:
+        """Return mono 16-bit WAV audio for a text, from the segment cache when it was synthesized before"""
+        cache = get_tts_cache()
+        key = None
+        if cache is not None:
+            key = cache.make_key(text, voice_config['name'], LANGUAGE_CODE, SPEAKING_RATE, f"LINEAR16/{SAMPLE_RATE}")
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        
+        # Set the text input to be synthesized
+        synthesis_input = texttospeech.SynthesisInput(text=text)
+        
+        # Build the voice request
+        voice = texttospeech.VoiceSelectionParams(
+            language_code=LANGUAGE_CODE,
+            name=voice_config['name'],
+            ssml_gender=voice_config['gender']
+        )
+        
+        # Request uncompressed samples, so assembly needs no decoding step
+        audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.LINEAR16,
+            sample_rate_hertz=SAMPLE_RATE,
+            speaking_rate=SPEAKING_RATE
+        )
+        
+        # Perform the text-to-speech request
+        response = self.tts_client.synthesize_speech(
+            input=synthesis_input, 
+            voice=voice, 
+            audio_config=audio_config
+        )
+        
+        if cache is not None:
+            cache.put(key, response.audio_content)
+        return response.audio_content
 
-    def combine_audio_files(self, audio_files: List[str], output_file: str):
-        """Combine multiple audio files using ffmpeg with filter_complex"""
-        file_list = None
-        try:
-            # Create a temporary directory to store intermediate files
-            temp_dir = tempfile.mkdtemp()
-            
-            # Instead of using concat demuxer, we'll convert all files to the same format first,
-            # then use the concat audio filter
-            inputs = []
-            filter_parts = []
-            
-            for i, audio_file in enumerate(audio_files):
-                normalized_file = os.path.join(temp_dir, f"norm_{i}.wav")
-                
-                # Convert each file to WAV format with the same audio parameters
-                subprocess.run([
-                    'ffmpeg', '-y', '-i', audio_file, 
-                    '-acodec', 'pcm_s16le', '-ar', '22050', '-ac', '1',
-                    normalized_file
-                ], check=True)
-                
-                inputs.extend(['-i', normalized_file])
-                filter_parts.append(f'[{i}:0]')
-            
-            # Build the filter complex string
-            filter_complex = f"{''.join(filter_parts)}concat=n={len(audio_files)}:v=0:a=1[out]"
-            
-            # Combine all normalized audio files
-            cmd = ['ffmpeg', '-y']
-            cmd.extend(inputs)
-            cmd.extend(['-filter_complex', filter_complex, '-map', '[out]', output_file])
-            
-            print("Running ffmpeg command:", ' '.join(cmd))
-            subprocess.run(cmd, check=True)
-            
-            return True
-        except Exception as e:
-            print(f"Error combining audio files: {str(e)}")
-            if os.path.exists(output_file):
-                os.unlink(output_file)
-            return False
-        finally:
-            # Clean up temporary files
-            if file_list and os.path.exists(file_list):
-                os.unlink(file_list)
-                
-            # Clean up audio files
-            for audio_file in audio_files:
-                if os.path.exists(audio_file):
-                    try:
-                        os.unlink(audio_file)
-                    except Exception as e:
-                        print(f"Error cleaning up {audio_file}: {str(e)}")
-                        
-            # Clean up temp directory if it exists
-            import shutil
-            if 'temp_dir' in locals() and os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir, ignore_errors=True)
+    def synthesize_parts(self, parts: List[Tuple[str, str, str]]) -> List[np.ndarray]:
+        """Synthesize every (speaker, text, gender) part concurrently
 
-    def generate_silence(self, duration_ms: int) -> str:
-        """Generate a silent audio file of specified duration"""
-        output_file = os.path.join(self.audio_dir, f'silence_{duration_ms}ms.mp3')
-        if not os.path.exists(output_file):
-            subprocess.run([
-                'ffmpeg', '-f', 'lavfi', '-i',
-                f'anullsrc=r=24000:cl=mono:d={duration_ms/1000}',
-                '-c:a', 'libmp3lame', '-b:a', '48k',
-                output_file
-            ])
-        return output_file
+        Returns:
+            list: 16-bit samples of each part, in the order of parts
+            
+        Raises:
+            Exception: Naming the first part that failed
+        """
+        def synthesize(text: str, gender: str) -> np.ndarray:
+            return decode_wav(self.synthesize_segment(text, self.get_voice_for_gender(gender)))
+        
+        with ThreadPoolExecutor(max_workers=self.tts_workers, thread_name_prefix="tts") as executor:
+            futures = [executor.submit(synthesize, text, gender) for _, text, gender in parts]
+            wait(futures, return_when=FIRST_EXCEPTION)
+            failed = next((i for i, future in enumerate(futures) if future.done() and future.exception()), None)
+            if failed is not None:
+                # Skip the parts that have not started, let running ones finish
+                for future in futures:
+                    future.cancel()
+        
+        if failed is None:
+            return [future.result() for future in futures]
+        raise Exception(
+            f"Failed to synthesize part {failed + 1} of {len(parts)} ({parts[failed][0]}): "
+            f"{futures[failed].exception()}"
+        )
 
     def generate_audio(self, question: Dict) -> str:
         """
@@ -321,21 +309,22 @@ class AudioGenerator:
         Returns the path to the generated audio file.
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = os.path.join(self.audio_dir, f"question_{timestamp}.mp3")
+        output_file = os.path.join(self.audio_dir, f"question_{timestamp}.{self.output_format}")
         
         try:
             # Parse conversation into parts
             parts = self.parse_conversation(question)
             
-            # Generate audio for each part
+            # Synthesize all parts at once, then lay them out in order
+            part_samples = self.synthesize_parts(parts)
             audio_parts = []
             current_section = None
             
-            # Generate silence files for pauses
-            long_pause = self.generate_silence(2000)  # 2 second pause
-            short_pause = self.generate_silence(500)  # 0.5 second pause
+            # Pauses are plain zero samples
+            long_pause = silence(2000)  # 2 second pause
+            short_pause = silence(500)  # 0.5 second pause
             
-            for speaker, text, gender in parts:
+            for (speaker, text, gender), samples in zip(parts, part_samples):
                 # Detect section changes and add appropriate pauses
                 if speaker.lower() == 'announcer':
                     if 'पुढील' in text or 'ऐकून' in text:  # Introduction words in Marathi
@@ -349,23 +338,21 @@ class AudioGenerator:
                     audio_parts.append(long_pause)
                     current_section = 'conversation'
                 
-                # Get appropriate voice for this speaker
-                voice_config = self.get_voice_for_gender(gender)
-                print(f"Using voice {voice_config['name']} for {speaker} ({gender})")
-                
-                # Generate audio for this part
-                audio_file = self.generate_audio_part(text, voice_config)
-                if not audio_file:
-                    raise Exception("Failed to generate audio part")
-                audio_parts.append(audio_file)
+                print(f"Using voice {self.get_voice_for_gender(gender)['name']} for {speaker} ({gender})")
+                audio_parts.append(samples)
                 
                 # Add short pause between conversation turns
                 if current_section == 'conversation':
                     audio_parts.append(short_pause)
             
-            # Combine all parts into final audio
-            if not self.combine_audio_files(audio_parts, output_file):
-                raise Exception("Failed to combine audio files")
+            # Join the parts in memory and encode the result once
+            write_audio(concatenate(audio_parts), output_file)
+            
+            cache = get_tts_cache()
+            if cache is not None:
+                stats = cache.stats()
+                print(f"TTS segment cache: {stats['hits']} hits, {stats['misses']} misses "
+                      f"({stats['hit_rate']:.0%}), {stats['bytes'] / (1 << 20):.1f} MiB cached")
             
             return output_file
             
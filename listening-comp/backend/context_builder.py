@@ -0,0 +1,139 @@
+import math
+import re
+from typing import Dict, List, Optional, Set
+from backend.local_embedding import tokenize
+from backend.question_parser import parse_answer_number
+
+CONTEXT_HEADER = "Here are some example Marathi listening questions:\n\n"
+
+# A new speaker turn starts after a sentence end with a short "Speaker:" label
+_TURN_BOUNDARY = re.compile(r'(?<=[.?!।])\s+(?=[^\s:.?!।]+(?:\s[^\s:.?!।]+)?:\s)')
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the model tokens of a text
+
+    Latin text averages about four characters per token, while Devanagari
+    is split much finer, closer to one token per two characters.
+    """
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 2)
+
+def split_turns(conversation: str) -> List[str]:
+    """Split a dialogue into speaker turns, by line or by "Speaker:" labels"""
+    lines = [line.strip() for line in conversation.split('\n') if line.strip()]
+    if len(lines) > 1:
+        return lines
+    return [turn.strip() for turn in _TURN_BOUNDARY.split(conversation) if turn.strip()]
+
+def format_example(section_num: int, idx: int, question: Dict, conversation: Optional[str] = None) -> str:
+    """Format one few-shot example, optionally with a shortened conversation"""
+    text = f"Example {idx}:\n"
+    if section_num == 2:
+        text += f"Introduction: {question.get('Introduction', '')}\n"
+        text += f"Conversation: {question.get('Conversation', '') if conversation is None else conversation}\n"
+    else:  # section 3
+        text += f"Situation: {question.get('Situation', '')}\n"
+    text += f"Question: {question.get('Question', '')}\n"
+    if 'Options' in question:
+        text += "Options:\n"
+        for i, opt in enumerate(question['Options'], 1):
+            text += f"{i}. {opt}\n"
+    if parse_answer_number(question.get('CorrectAnswer')) is not None:
+        text += f"Correct Answer: {question['CorrectAnswer']}\n"
+    return text + "\n"
+
+class FewShotContextBuilder:
+    def __init__(
+        self,
+        token_budget: int = 1200,
+        max_examples: int = 3,
+        diversity: float = 0.3,
+        min_turns: int = 2
+    ):
+        """Initialize the builder of token-budgeted few-shot contexts
+
+        Args:
+            token_budget: Estimated tokens the examples may use in total
+            max_examples: Most examples included
+            diversity: Weight of the redundancy penalty in maximal marginal
+                relevance, 0 keeps the retrieval order
+            min_turns: Fewest dialogue turns an example is shortened to
+        """
+        self.token_budget = token_budget
+        self.max_examples = max_examples
+        self.diversity = diversity
+        self.min_turns = min_turns
+        self.tokens_saved = 0
+
+    def build(self, section_num: int, candidates: List[Dict]) -> str:
+        """Build the few-shot context from retrieved questions, best match first
+
+        Examples are picked greedily by maximal marginal relevance: the
+        retrieval rank, minus the word overlap with examples already picked.
+        Each example gets an even share of the remaining budget. A dialogue
+        that does not fit its share keeps only its leading turns, and
+        examples that still do not fit are skipped.
+        """
+        if not candidates:
+            return ""
+
+        words = [self._words(question) for question in candidates]
+        relevance = [1 - rank / len(candidates) for rank in range(len(candidates))]
+        remaining = self.token_budget - estimate_tokens(CONTEXT_HEADER)
+        chosen: List[int] = []
+        parts: List[str] = []
+        pending = list(range(len(candidates)))
+
+        while pending and len(chosen) < self.max_examples:
+            def marginal_relevance(i: int) -> float:
+                overlap = max((self._jaccard(words[i], words[j]) for j in chosen), default=0.0)
+                return (1 - self.diversity) * relevance[i] - self.diversity * overlap
+
+            best = max(pending, key=marginal_relevance)
+            pending.remove(best)
+            # Share what is left between the slots still to fill, so one long
+            # dialogue cannot crowd out the other examples
+            slots = min(self.max_examples - len(chosen), len(pending) + 1)
+            example = self._fit_example(section_num, len(chosen) + 1, candidates[best], remaining // slots)
+            if example is None:
+                continue
+            chosen.append(best)
+            parts.append(example)
+            remaining -= estimate_tokens(example)
+
+        context = CONTEXT_HEADER + ''.join(parts) if parts else ""
+        # Compared with pasting the first max_examples candidates verbatim
+        verbatim = CONTEXT_HEADER + ''.join(
+            format_example(section_num, idx, question)
+            for idx, question in enumerate(candidates[:self.max_examples], 1)
+        )
+        saved = estimate_tokens(verbatim) - estimate_tokens(context)
+        self.tokens_saved += max(saved, 0)
+        print(f"Few-shot context: {len(parts)} of {len(candidates)} examples, "
+              f"~{estimate_tokens(context)} tokens, ~{saved} saved against verbatim examples")
+        return context
+
+    def _fit_example(self, section_num: int, idx: int, question: Dict, budget: int) -> Optional[str]:
+        """Format an example within budget, dropping trailing dialogue turns if needed"""
+        example = format_example(section_num, idx, question)
+        if estimate_tokens(example) <= budget:
+            return example
+        if section_num != 2:
+            return None
+
+        turns = split_turns(question.get('Conversation', ''))
+        for keep in range(len(turns) - 1, self.min_turns - 1, -1):
+            conversation = '\n'.join(turns[:keep] + ['...'])
+            example = format_example(section_num, idx, question, conversation)
+            if estimate_tokens(example) <= budget:
+                return example
+        return None
+
+    @staticmethod
+    def _words(question: Dict) -> Set[str]:
+        fields = ('Introduction', 'Conversation', 'Situation', 'Question')
+        return set(tokenize(' '.join(str(question.get(field, '')) for field in fields)))
+
+    @staticmethod
+    def _jaccard(a: Set[str], b: Set[str]) -> float:
+        return len(a & b) / len(a | b) if a or b else 0.0
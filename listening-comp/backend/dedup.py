@@ -0,0 +1,97 @@
+import zlib
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from backend.local_embedding import normalize_text
+
+# Smallest prime above 2**32, the range of the crc32 shingle hashes
+_PRIME = 4294967311
+
+class MinHashDeduplicator:
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 1
+    ):
+        """Initialize a MinHash/LSH near-duplicate detector
+
+        Args:
+            threshold: Estimated Jaccard similarity of character shingles at
+                or above which a text counts as a duplicate
+            num_perm: Number of hash permutations in each signature
+            bands: Number of LSH bands, num_perm must be divisible by it
+            shingle_size: Length of the character shingles
+            seed: Seed for the hash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.default_rng(seed)
+        # Coefficients below 2**32 keep a * x + b within uint64
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.buckets: Dict[Tuple[int, bytes], List[str]] = {}
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text's character shingles"""
+        text = ' '.join(normalize_text(text).split())
+        size = self.shingle_size
+        shingles = {text[i:i + size] for i in range(max(1, len(text) - size + 1))}
+        hashes = np.array(
+            [zlib.crc32(shingle.encode('utf-8')) for shingle in shingles],
+            dtype=np.uint64
+        )
+        # (a * x + b) mod p for every permutation/shingle pair
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def find_duplicate(self, signature: np.ndarray, exclude: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """Return the most similar indexed (id, similarity) above the threshold
+
+        A signature indexed under the exclude id is never reported, so a
+        document is not a duplicate of itself.
+        """
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self.buckets.get(key, ()))
+        candidates.discard(exclude)
+
+        best = None
+        for candidate in candidates:
+            similarity = float(np.mean(self.signatures[candidate] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+        return best
+
+    def add(self, doc_id: str, signature: np.ndarray):
+        """Index a signature under a document id"""
+        if doc_id in self.signatures:
+            return
+        self.signatures[doc_id] = signature
+        for key in self._band_keys(signature):
+            self.buckets.setdefault(key, []).append(doc_id)
+
+    def remove(self, doc_id: str):
+        """Drop the signature indexed under a document id, if any"""
+        signature = self.signatures.pop(doc_id, None)
+        if signature is None:
+            return
+        for key in self._band_keys(signature):
+            bucket = self.buckets.get(key)
+            if bucket and doc_id in bucket:
+                bucket.remove(doc_id)
+                if not bucket:
+                    del self.buckets[key]
@@ -0,0 +1,160 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class DiskCache:
+    def __init__(
+        self,
+        path: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None
+    ):
+        """Initialize a persistent key/value cache backed by SQLite
+
+        Args:
+            path: Location of the SQLite database file
+            max_entries: Evict least recently used entries beyond this count
+            max_bytes: Evict least recently used entries beyond this total size
+            ttl: Treat entries older than this many seconds as misses
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # The connection is shared between threads, every access goes through the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                created REAL NOT NULL DEFAULT 0
+            )
+        """)
+        # Caches created before TTL support lack the created column
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(cache)")]
+        if 'created' not in columns:
+            self._conn.execute("ALTER TABLE cache ADD COLUMN created REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache(last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value for a key, or None on a miss"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Return cached values for the keys that are present"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        stale = []
+        now = time.time()
+        with self._lock:
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value, created FROM cache WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                found.update((key, value) for key, value, _ in rows)
+                if self.ttl is not None:
+                    stale.extend(key for key, _, created in rows if now - created > self.ttl)
+
+            if stale:
+                for key in stale:
+                    del found[key]
+                self._conn.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in stale])
+                self._conn.commit()
+                self.expired += len(stale)
+
+            if found:
+                self._conn.executemany(
+                    "UPDATE cache SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set(self, key: str, value: bytes):
+        """Store a value under a key"""
+        self.set_many([(key, value)])
+
+    def set_many(self, items: List[Tuple[str, bytes]]):
+        """Store several values and evict old entries if over the size cap"""
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, size, last_access, created) VALUES (?, ?, ?, ?, ?)",
+                [(key, sqlite3.Binary(value), len(value), now, now) for key, value in items]
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its caps"""
+        if self.max_entries is not None:
+            count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN "
+                    "(SELECT key FROM cache ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+        if self.max_bytes is not None:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                freed = 0
+                victims = []
+                for key, size in self._conn.execute("SELECT key, size FROM cache ORDER BY last_access ASC"):
+                    victims.append((key,))
+                    freed += size
+                    if freed >= excess:
+                        break
+                self._conn.executemany("DELETE FROM cache WHERE key = ?", victims)
+
+    def clear(self):
+        """Remove every entry and reset the counters"""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+            self.expired = 0
+
+    def stats(self) -> Dict:
+        """Report hit/miss counters and the current cache size"""
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expired": self.expired,
+                "entries": entries,
+                "bytes": total_bytes
+            }
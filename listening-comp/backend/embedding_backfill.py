@@ -0,0 +1,188 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+class PendingEmbeddingQueue:
+    def __init__(self, path: str):
+        """Initialize the durable queue of documents stored with a fallback vector
+
+        Args:
+            path: Location of the SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pending (
+                id TEXT PRIMARY KEY,
+                section INTEGER NOT NULL,
+                document TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL,
+                created REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pending_next_attempt ON pending(next_attempt)")
+        self._conn.commit()
+
+    def add_many(self, section_num: int, items: List[Tuple[str, str]]):
+        """Record (vector id, document) pairs that still need a real embedding"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO pending (id, section, document, next_attempt, created) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(id_, section_num, document, now, now) for id_, document in items]
+            )
+            self._conn.commit()
+
+    def due(self, limit: int, now: Optional[float] = None) -> List[Tuple[str, int, str, int]]:
+        """Return up to limit (id, section, document, attempts) rows ready for a retry"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, section, document, attempts FROM pending "
+                "WHERE next_attempt <= ? ORDER BY next_attempt LIMIT ?",
+                (time.time() if now is None else now, limit)
+            ).fetchall()
+
+    def reschedule(self, items: List[Tuple[str, float]]):
+        """Push (id, next attempt time) rows back after another failure"""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE pending SET attempts = attempts + 1, next_attempt = ? WHERE id = ?",
+                [(next_attempt, id_) for id_, next_attempt in items]
+            )
+            self._conn.commit()
+
+    def remove_many(self, ids: List[str]):
+        """Drop rows whose real embedding has been stored"""
+        with self._lock:
+            self._conn.executemany("DELETE FROM pending WHERE id = ?", [(id_,) for id_ in ids])
+            self._conn.commit()
+
+    def delete_section(self, section_num: int):
+        """Drop every row for a section"""
+        with self._lock:
+            self._conn.execute("DELETE FROM pending WHERE section = ?", (section_num,))
+            self._conn.commit()
+
+    def count(self, section_num: Optional[int] = None) -> int:
+        """Number of documents still waiting for a real embedding"""
+        with self._lock:
+            if section_num is None:
+                return self._conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM pending WHERE section = ?", (section_num,)
+            ).fetchone()[0]
+
+class EmbeddingBackfillWorker:
+    def __init__(
+        self,
+        vector_store,
+        queue: PendingEmbeddingQueue,
+        interval: float = 30.0,
+        batch_size: int = 32,
+        backoff_base: float = 30.0,
+        max_backoff: float = 3600.0
+    ):
+        """Initialize the background worker that re-embeds degraded documents
+
+        Args:
+            vector_store: Store whose embedding function and replace_embeddings
+                method are used to replace the fallback vectors
+            queue: Queue of documents stored with a fallback vector
+            interval: Seconds between polls of the queue
+            batch_size: Documents re-embedded per batch
+            backoff_base: Delay before the first retry of a document that
+                fails again, doubled on each further failure
+            max_backoff: Upper bound on the retry delay
+        """
+        self.vector_store = vector_store
+        self.queue = queue
+        self.interval = interval
+        self.batch_size = batch_size
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.repaired = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def degraded_count(self) -> int:
+        """Number of stored documents still carrying a fallback vector"""
+        return self.queue.count()
+
+    def run_once(self) -> int:
+        """Retry every document that is due, returning how many were repaired"""
+        # Imported here to avoid a circular import with vector_store
+        from backend.vector_store import is_zero_vector
+
+        repaired = 0
+        while not self._stop.is_set():
+            rows = self.queue.due(self.batch_size)
+            if not rows:
+                break
+
+            embeddings = self.vector_store.embedding_fn([document for _, _, document, _ in rows])
+            now = time.time()
+            fixed = {}
+            failed = []
+            for (id_, section_num, _, attempts), embedding in zip(rows, embeddings):
+                if is_zero_vector(embedding):
+                    delay = min(self.max_backoff, self.backoff_base * (2 ** attempts))
+                    failed.append((id_, now + delay))
+                else:
+                    fixed.setdefault(section_num, []).append((id_, embedding))
+
+            for section_num, items in fixed.items():
+                self.vector_store.replace_embeddings(
+                    section_num, [id_ for id_, _ in items], [embedding for _, embedding in items]
+                )
+                self.queue.remove_many([id_ for id_, _ in items])
+                repaired += len(items)
+            if failed:
+                self.queue.reschedule(failed)
+                permanent_error = getattr(self.vector_store.embedding_fn, 'permanent_error', None)
+                if permanent_error and not fixed:
+                    # Retrying cannot help until the configuration is fixed
+                    print(f"Stopping embedding backfill after a non-retryable error ({permanent_error}), "
+                          f"{self.degraded_count} embedding(s) stay degraded until restart")
+                    self._stop.set()
+                # Embedding is still failing, wait for the next poll
+                break
+
+        if repaired:
+            self.repaired += repaired
+            print(f"Backfilled {repaired} embedding(s), {self.degraded_count} still degraded")
+        return repaired
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error backfilling embeddings: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start polling the queue in a daemon thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="embedding-backfill", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the worker thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
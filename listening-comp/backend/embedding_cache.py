@@ -0,0 +1,41 @@
+import hashlib
+from array import array
+from typing import Dict, List, Optional
+from backend.disk_cache import DiskCache
+
+class EmbeddingCache:
+    def __init__(self, path: str, max_entries: int = 50000):
+        """Initialize an on-disk embedding cache keyed by (model_id, sha256(text))
+
+        Vectors are stored as raw float32 bytes.
+        """
+        self.store = DiskCache(path, max_entries=max_entries)
+
+    @staticmethod
+    def make_key(model_id: str, text: str) -> str:
+        """Build the content-addressed cache key for a text"""
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{model_id}:{digest}"
+
+    def get_many(self, model_id: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up embeddings for texts, returning None for misses"""
+        keys = [self.make_key(model_id, text) for text in texts]
+        found = self.store.get_many(keys)
+        embeddings = []
+        for key in keys:
+            if key in found:
+                embeddings.append(array('f', found[key]).tolist())
+            else:
+                embeddings.append(None)
+        return embeddings
+
+    def put_many(self, model_id: str, texts: List[str], embeddings: List[List[float]]):
+        """Store embeddings for texts"""
+        self.store.set_many([
+            (self.make_key(model_id, text), array('f', embedding).tobytes())
+            for text, embedding in zip(texts, embeddings)
+        ])
+
+    def stats(self) -> Dict:
+        """Report hit/miss counters and the current cache size"""
+        return self.store.stats()
@@ -0,0 +1,210 @@
+"""
+Bulk index stored questions into the question vector store.
+
+Streams backend/data/stored_questions.json, embeds questions in batches and
+writes them to the vector store chunk by chunk. The ids of every chunk are
+appended to a checkpoint log, so an interrupted run picks up where it
+stopped, and questions that are already indexed are skipped.
+
+Usage (from the listening-comp directory):
+    python -m backend.index_questions [--chunk-size 64] [--restart]
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.vector_store import get_vector_store
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_QUESTIONS_FILE = os.path.join(DATA_DIR, "stored_questions.json")
+DEFAULT_CHECKPOINT_FILE = os.path.join(DATA_DIR, "index_checkpoint.json")
+
+def iter_stored_questions(questions_file: str, read_size: int = 1 << 20) -> Iterator[Tuple[str, Dict]]:
+    """Yield (question_id, stored question) pairs one entry at a time
+
+    The file is read read_size characters at a time and entries are
+    decoded as soon as they are complete, so only the entry being decoded
+    and the unread rest of the current read are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    with open(questions_file, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+
+        def read_more() -> bool:
+            nonlocal buffer, pos, eof
+            if eof:
+                return False
+            data = f.read(read_size)
+            if not data:
+                eof = True
+                return False
+            # Drop what has been decoded already before growing the buffer
+            buffer = buffer[pos:] + data
+            pos = 0
+            return True
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+                if pos < len(buffer) or not read_more():
+                    return
+
+        def decode():
+            """Decode the next value, reading on until it is complete"""
+            nonlocal pos
+            skip_whitespace()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if read_more():
+                        continue
+                    raise
+                # A value ending with the buffer may continue in the next read
+                if end < len(buffer) or not read_more():
+                    pos = end
+                    return value
+
+        def expect(char: str, message: str):
+            nonlocal pos
+            skip_whitespace()
+            if pos >= len(buffer) or buffer[pos] != char:
+                raise ValueError(message)
+            pos += 1
+
+        skip_whitespace()
+        if pos == len(buffer):
+            return
+        expect('{', f"{questions_file} does not contain a JSON object")
+
+        skip_whitespace()
+        while pos < len(buffer) and buffer[pos] != '}':
+            question_id = decode()
+            expect(':', f"Malformed entry for {question_id} in {questions_file}")
+            yield question_id, decode()
+            skip_whitespace()
+            if pos < len(buffer) and buffer[pos] == ',':
+                pos += 1
+                skip_whitespace()
+
+def load_checkpoint(checkpoint_file: str, questions_file: str) -> Optional[Set[str]]:
+    """Return the question ids already processed for this source file
+
+    The checkpoint is a line-delimited log: a JSON header naming the source
+    file, then one processed question id per line.
+
+    Returns:
+        set: The processed ids, or None when there is no checkpoint for
+        this source file
+    """
+    if not os.path.exists(checkpoint_file):
+        return None
+    try:
+        with open(checkpoint_file, 'r', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            # A line cut off by an interrupted append names no real id, and
+            # that question is found already indexed on the next run
+            done = {line.rstrip('\n') for line in f if line.strip()}
+    except (json.JSONDecodeError, FileNotFoundError) as e:
+        print(f"Ignoring unreadable checkpoint {checkpoint_file}: {e}")
+        return None
+    if not isinstance(header, dict) or header.get('source') != os.path.abspath(questions_file):
+        return None
+    return done
+
+def start_checkpoint(checkpoint_file: str, questions_file: str):
+    """Atomically replace the checkpoint with an empty one for the source file"""
+    os.makedirs(os.path.dirname(checkpoint_file) or '.', exist_ok=True)
+    tmp_file = checkpoint_file + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({"source": os.path.abspath(questions_file)}) + "\n")
+    os.replace(tmp_file, checkpoint_file)
+
+def append_checkpoint(checkpoint_file: str, question_ids: List[str]):
+    """Record newly processed question ids, writing only the new ones"""
+    with open(checkpoint_file, 'a', encoding='utf-8') as f:
+        f.write(''.join(f"{question_id}\n" for question_id in question_ids))
+        f.flush()
+        os.fsync(f.fileno())
+
+def index_questions(
+    questions_file: str = DEFAULT_QUESTIONS_FILE,
+    checkpoint_file: str = DEFAULT_CHECKPOINT_FILE,
+    chunk_size: int = 64,
+    restart: bool = False,
+    backend: str = None
+) -> Dict[str, int]:
+    """Index every stored question, resuming from the checkpoint
+
+    Returns:
+        dict: Counts of indexed, skipped (already indexed or checkpointed),
+        duplicate and invalid questions
+    """
+    vector_store = get_vector_store(backend)
+    done = None if restart else load_checkpoint(checkpoint_file, questions_file)
+    if done is None:
+        done = set()
+        start_checkpoint(checkpoint_file, questions_file)
+    stats = {"indexed": 0, "skipped": 0, "duplicates": 0, "invalid": 0}
+    pending = {2: [], 3: []}
+
+    def flush(section_num):
+        records = pending[section_num]
+        if not records:
+            return
+        # Skip questions that were indexed outside of this indexer
+        already_indexed = vector_store.get_indexed_ids(
+            section_num, [f"{question_id}_{section_num}_0" for question_id, _, _ in records]
+        )
+        fresh = [r for r in records if f"{r[0]}_{section_num}_0" not in already_indexed]
+        dropped = vector_store.add_records(section_num, fresh)
+
+        stats["skipped"] += len(records) - len(fresh)
+        stats["duplicates"] += dropped
+        stats["indexed"] += len(fresh) - dropped
+        append_checkpoint(checkpoint_file, [question_id for question_id, _, _ in records])
+        pending[section_num] = []
+        print(f"Wrote a section {section_num} chunk: {stats['indexed']} indexed so far "
+              f"({stats['skipped']} skipped, {stats['duplicates']} duplicates)")
+
+    for question_id, qdata in iter_stored_questions(questions_file):
+        if question_id in done:
+            stats["skipped"] += 1
+            continue
+
+        question = qdata.get('question') if isinstance(qdata, dict) else None
+        if not question:
+            stats["invalid"] += 1
+            continue
+
+        section_num = 2 if qdata.get('practice_type') == "Dialogue Practice" else 3
+        pending[section_num].append((question_id, question, qdata.get('topic')))
+        if len(pending[section_num]) >= chunk_size:
+            flush(section_num)
+
+    for section_num in pending:
+        flush(section_num)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', default=DEFAULT_QUESTIONS_FILE, help="Path to stored_questions.json")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_FILE, help="Path to the progress checkpoint")
+    parser.add_argument('--chunk-size', type=int, default=64, help="Questions embedded and written per chunk")
+    parser.add_argument('--restart', action='store_true', help="Ignore the checkpoint and start over")
+    parser.add_argument('--backend', default=None, help="Vector store backend (chroma or numpy)")
+    args = parser.parse_args()
+
+    stats = index_questions(args.questions, args.checkpoint, args.chunk_size, args.restart, args.backend)
+    print(f"\nDone: {stats['indexed']} indexed, {stats['skipped']} skipped, "
+          f"{stats['duplicates']} duplicates, {stats['invalid']} invalid")
+
+if __name__ == "__main__":
+    main()
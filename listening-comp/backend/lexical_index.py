@@ -0,0 +1,65 @@
+import heapq
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+from backend.local_embedding import tokenize
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """Initialize an in-memory BM25 index over Devanagari word tokens"""
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: List[str] = []
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self._known_ids = set()
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def add(self, doc_id: str, text: str):
+        """Index a document, ignoring ids that are already indexed"""
+        if doc_id in self._known_ids:
+            return
+        doc_idx = len(self.doc_ids)
+        tokens = tokenize(text)
+        for term, tf in Counter(tokens).items():
+            self.postings.setdefault(term, {})[doc_idx] = tf
+        self.doc_ids.append(doc_id)
+        self.doc_lengths.append(len(tokens))
+        self._known_ids.add(doc_id)
+        self._total_length += len(tokens)
+
+    def search(self, query: str, k: int, allowed: Optional[Set[str]] = None) -> List[Tuple[str, float]]:
+        """Return up to k (doc id, score) pairs for documents sharing terms with the query
+
+        When allowed is given, only those doc ids are scored.
+        """
+        if not self.doc_ids or k <= 0:
+            return []
+
+        n_docs = len(self.doc_ids)
+        avg_length = self._total_length / n_docs or 1.0
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_idx, tf in postings.items():
+                if allowed is not None and self.doc_ids[doc_idx] not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_idx] / avg_length)
+                scores[doc_idx] = scores.get(doc_idx, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.doc_ids[doc_idx], score) for doc_idx, score in top]
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[str]:
+    """Fuse several ranked id lists into one using reciprocal rank fusion"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda doc_id: scores[doc_id], reverse=True)
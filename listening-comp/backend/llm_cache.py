@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, Optional
+from backend.disk_cache import DiskCache
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "llm_cache.sqlite3")
+
+class LLMResponseCache:
+    def __init__(self, path: str, ttl: Optional[float] = 7 * 24 * 3600, max_entries: int = 5000):
+        """Initialize an on-disk cache of model responses
+
+        Entries are keyed by (model_id, inference config, sha256(prompt)),
+        expire after ttl seconds and are evicted least recently used first.
+        """
+        self.store = DiskCache(path, max_entries=max_entries, ttl=ttl)
+        self.bypassed = 0
+
+    @staticmethod
+    def make_key(model_id: str, inference_config: Dict, prompt: str) -> str:
+        """Build the cache key for a request"""
+        config = json.dumps(inference_config, sort_keys=True)
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        return f"{model_id}:{config}:{digest}"
+
+    def get(self, model_id: str, inference_config: Dict, prompt: str) -> Optional[str]:
+        """Return the cached response text, or None on a miss"""
+        value = self.store.get(self.make_key(model_id, inference_config, prompt))
+        return None if value is None else value.decode('utf-8')
+
+    def put(self, model_id: str, inference_config: Dict, prompt: str, response: str):
+        """Store a response text"""
+        self.store.set(self.make_key(model_id, inference_config, prompt), response.encode('utf-8'))
+
+    def stats(self) -> Dict:
+        """Report hit/miss/bypass counters and the current cache size"""
+        stats = self.store.stats()
+        stats["bypassed"] = self.bypassed
+        return stats
+
+# Process-wide cache shared by the question and audio generators
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Return the shared response cache, or None when LLM_CACHE_TTL is 0
+
+    The TTL in seconds comes from the LLM_CACHE_TTL environment variable
+    and defaults to a week.
+    """
+    global _llm_cache
+    ttl = float(os.environ.get("LLM_CACHE_TTL", 7 * 24 * 3600))
+    if ttl <= 0:
+        return None
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache(DEFAULT_CACHE_PATH, ttl=ttl)
+        return _llm_cache
+
+def converse_cached(
+    bedrock_client,
+    model_id: str,
+    prompt: str,
+    inference_config: Dict,
+    bypass_cache: bool = False,
+    validate: Optional[Callable[[str], bool]] = None
+) -> str:
+    """Send a single-turn prompt through the Bedrock converse API, with caching
+
+    Identical requests are answered from the shared response cache. Set
+    bypass_cache for calls that rely on sampling to produce a different
+    answer every time. When validate is given, only responses it accepts
+    are cached or served from the cache, so a malformed answer is asked
+    for again instead of being replayed. Errors from Bedrock are raised
+    to the caller.
+    """
+    cache = get_llm_cache()
+    if cache is not None and bypass_cache:
+        cache.bypassed += 1
+    elif cache is not None:
+        cached = cache.get(model_id, inference_config, prompt)
+        if cached is not None and (validate is None or validate(cached)):
+            return cached
+
+    response = bedrock_client.converse(
+        modelId=model_id,
+        messages=[{
+            "role": "user",
+            "content": [{
+                "text": prompt
+            }]
+        }],
+        inferenceConfig=inference_config
+    )
+    text = response['output']['message']['content'][0]['text']
+
+    if cache is not None and not bypass_cache and (validate is None or validate(text)):
+        cache.put(model_id, inference_config, prompt, text)
+    return text
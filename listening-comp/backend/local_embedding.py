@@ -0,0 +1,91 @@
+import re
+import unicodedata
+import zlib
+import numpy as np
+from chromadb.utils import embedding_functions
+from typing import List
+
+VIRAMA = '\u094d'
+ZERO_WIDTH_CHARS = '\u200c\u200d'
+DEVANAGARI_DIGITS = {0x0966 + i: str(i) for i in range(10)}
+# Devanagari block minus the danda marks, which act as sentence separators
+WORD_PATTERN = re.compile(r'[0-9a-z\u0900-\u0963\u0966-\u097f]+')
+
+def normalize_text(text: str) -> str:
+    """Normalize Marathi text so equivalent spellings hash identically"""
+    text = unicodedata.normalize('NFC', text or '').lower()
+    text = text.translate(DEVANAGARI_DIGITS)
+    for char in ZERO_WIDTH_CHARS:
+        text = text.replace(char, '')
+    return text
+
+def tokenize(text: str) -> List[str]:
+    """Split normalized text into Devanagari/Latin word tokens"""
+    return WORD_PATTERN.findall(normalize_text(text))
+
+def split_aksharas(word: str) -> List[str]:
+    """Split a Devanagari word into aksharas (orthographic syllables)
+
+    Vowel signs, anusvara, nukta and virama stay attached to their base
+    consonant, and a consonant following a virama joins the conjunct, so
+    n-grams are built over units a reader would recognise.
+    """
+    aksharas = []
+    for char in word:
+        is_mark = unicodedata.category(char) in ('Mn', 'Mc')
+        joins_conjunct = bool(aksharas) and aksharas[-1].endswith(VIRAMA)
+        if aksharas and (is_mark or joins_conjunct):
+            aksharas[-1] += char
+        else:
+            aksharas.append(char)
+    return aksharas
+
+class HashedNgramEmbeddingFunction(embedding_functions.EmbeddingFunction):
+    def __init__(self, dimension: int = 1024, ngram_range=(1, 3), word_weight: float = 2.0):
+        """Initialize an offline embedding function based on hashed akshara n-grams
+
+        Args:
+            dimension: Size of the hashed feature space
+            ngram_range: Smallest and largest akshara n-gram to extract
+            word_weight: Weight of whole-word features relative to n-grams
+        """
+        self.dimension = dimension
+        self.ngram_range = ngram_range
+        self.word_weight = word_weight
+        self.model_id = f"local-hashed-ngram-{dimension}"
+
+    def _features(self, text: str):
+        """Yield (feature, weight) pairs for a text"""
+        for word in tokenize(text):
+            yield f"w:{word}", self.word_weight
+            units = ['<'] + split_aksharas(word) + ['>']
+            min_n, max_n = self.ngram_range
+            for n in range(min_n, max_n + 1):
+                for start in range(len(units) - n + 1):
+                    gram = units[start:start + n]
+                    if n == 1 and gram[0] in ('<', '>'):
+                        continue
+                    yield 'g:' + '|'.join(gram), 1.0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts into an L2-normalized float32 matrix"""
+        rows, cols, values = [], [], []
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                digest = zlib.crc32(feature.encode('utf-8'))
+                rows.append(row)
+                cols.append(digest % self.dimension)
+                # Signed hashing keeps collisions from biasing similarities upwards
+                values.append(weight if (digest // self.dimension) & 1 else -weight)
+
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        if rows:
+            np.add.at(matrix, (np.array(rows), np.array(cols)), np.array(values, dtype=np.float32))
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for a list of texts without any network calls"""
+        return self.embed(list(texts)).tolist()
@@ -0,0 +1,415 @@
+import json
+import os
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+INDEX_VERSION = 1
+QUANTIZATION_MODES = ("none", "int8")
+
+class NumpyVectorIndex:
+    def __init__(
+        self,
+        directory: str,
+        ivf_threshold: int = 4096,
+        nprobe: int = 8,
+        quantization: str = "none",
+        rerank_factor: int = 4
+    ):
+        """Initialize an append-only cosine similarity index stored on disk
+
+        Vectors live in a raw float32 file that is memory-mapped for queries,
+        records (id and metadata) in a JSON lines file alongside it. A small
+        manifest written after every insert is the commit point: on load,
+        anything past the row count it records is a torn write and is dropped.
+
+        With int8 quantization every vector also gets a per-row scaled int8
+        copy. Queries scan the int8 codes (a quarter of the float32 size) and
+        re-rank a shortlist of rerank_factor * k candidates exactly against
+        the float32 rows, so only those rows of the float file are touched.
+
+        Args:
+            directory: Directory holding the index files
+            ivf_threshold: Switch from exhaustive search to IVF partitioning
+                once the index holds this many vectors
+            nprobe: Number of IVF partitions scanned per query
+            quantization: "none" or "int8"
+            rerank_factor: Shortlist size per requested result that is
+                re-ranked with exact float32 scores when quantized
+        """
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization {quantization}, expected one of {QUANTIZATION_MODES}")
+        self.directory = directory
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.quantization = quantization
+        self.rerank_factor = max(1, rerank_factor)
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.records_path = os.path.join(directory, "records.jsonl")
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self.codes_path = os.path.join(directory, "vectors.i8")
+        self.scales_path = os.path.join(directory, "scales.f32")
+
+        self._lock = threading.RLock()
+        self.dimension: Optional[int] = None
+        self.ids: List[str] = []
+        self.metadatas: List[Dict] = []
+        self.id_to_row: Dict[str, int] = {}
+        # Rows per metadata value, built per field on the first filtered query
+        self._value_rows: Dict[str, Dict] = {}
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._codes = np.empty((0, 0), dtype=np.int8)
+        self._scales = np.empty(0, dtype=np.float32)
+        self._reset_ivf()
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @property
+    def count(self) -> int:
+        return len(self.ids)
+
+    def _reset_ivf(self):
+        self._centroids = None
+        self._partitions: List[List[int]] = []
+        self._row_partitions: List[int] = []
+        self._ivf_built_at = 0
+
+    def _load(self):
+        """Load the last committed snapshot, discarding any torn appends"""
+        if not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version {manifest.get('version')} in {self.directory}")
+
+        count = manifest['count']
+        self.dimension = manifest['dimension']
+
+        committed_bytes = 0
+        with open(self.records_path, 'rb') as f:
+            for line in f:
+                if len(self.ids) == count:
+                    break
+                record = json.loads(line.decode('utf-8'))
+                committed_bytes += len(line)
+                self.id_to_row[record['id']] = len(self.ids)
+                self.ids.append(record['id'])
+                self.metadatas.append(record['metadata'])
+        self._truncate(self.records_path, committed_bytes)
+        self._truncate(self.vectors_path, count * self.dimension * 4)
+        if self.quantization == "int8" and count:
+            self._truncate(self.codes_path, count * self.dimension)
+            self._truncate(self.scales_path, count * 4)
+            self._remap()
+            self._backfill_codes()
+        self._remap()
+
+    def _backfill_codes(self, block_size: int = 8192):
+        """Quantize rows missing from the int8 files, e.g. for an index built unquantized"""
+        coded = os.path.getsize(self.codes_path) // self.dimension if os.path.exists(self.codes_path) else 0
+        scaled = os.path.getsize(self.scales_path) // 4 if os.path.exists(self.scales_path) else 0
+        start = min(coded, scaled)
+        self._truncate(self.codes_path, start * self.dimension)
+        self._truncate(self.scales_path, start * 4)
+        for offset in range(start, self.count, block_size):
+            self._append_codes(np.asarray(self._matrix[offset:offset + block_size]))
+
+    @staticmethod
+    def _truncate(path: str, size: int):
+        if os.path.exists(path) and os.path.getsize(path) > size:
+            with open(path, 'r+b') as f:
+                f.truncate(size)
+
+    def _remap(self):
+        """Memory-map the committed vectors"""
+        if self.count == 0 or not self.dimension:
+            self._matrix = np.empty((0, self.dimension or 0), dtype=np.float32)
+            self._codes = np.empty((0, self.dimension or 0), dtype=np.int8)
+            self._scales = np.empty(0, dtype=np.float32)
+            return
+
+        self._matrix = np.memmap(
+            self.vectors_path, dtype=np.float32, mode='r',
+            shape=(self.count, self.dimension)
+        )
+        if self.quantization == "int8" and os.path.exists(self.codes_path) \
+                and os.path.getsize(self.codes_path) >= self.count * self.dimension:
+            self._codes = np.memmap(
+                self.codes_path, dtype=np.int8, mode='r',
+                shape=(self.count, self.dimension)
+            )
+            self._scales = np.memmap(self.scales_path, dtype=np.float32, mode='r', shape=(self.count,))
+
+    @staticmethod
+    def _quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Symmetric per-row int8 quantization of normalized vectors"""
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def _append_codes(self, matrix: np.ndarray):
+        codes, scales = self._quantize(matrix)
+        with open(self.codes_path, 'ab') as f:
+            f.write(codes.tobytes())
+        with open(self.scales_path, 'ab') as f:
+            f.write(scales.tobytes())
+
+    def _write_manifest(self):
+        """Atomically commit the current row count"""
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "dimension": self.dimension,
+                "count": self.count
+            }, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).astype(np.float32)
+
+    def add(self, ids: List[str], vectors: List[List[float]], metadatas: List[Dict]) -> int:
+        """Append vectors with their ids and metadata, skipping ids already present
+
+        Returns:
+            int: Number of vectors added
+        """
+        with self._lock:
+            rows = [
+                (id_, vector, metadata)
+                for id_, vector, metadata in zip(ids, vectors, metadatas)
+                if id_ not in self.id_to_row
+            ]
+            if not rows:
+                return 0
+
+            matrix = self._normalize(np.asarray([vector for _, vector, _ in rows], dtype=np.float32))
+            if self.dimension is None:
+                self.dimension = matrix.shape[1]
+            elif matrix.shape[1] != self.dimension:
+                raise ValueError(f"Expected vectors of dimension {self.dimension}, got {matrix.shape[1]}")
+
+            with open(self.vectors_path, 'ab') as f:
+                f.write(matrix.tobytes())
+            if self.quantization == "int8":
+                self._append_codes(matrix)
+            with open(self.records_path, 'a', encoding='utf-8') as f:
+                for id_, _, metadata in rows:
+                    f.write(json.dumps({"id": id_, "metadata": metadata}, ensure_ascii=False) + "\n")
+
+            start = self.count
+            for offset, (id_, _, metadata) in enumerate(rows):
+                self.id_to_row[id_] = start + offset
+                self.ids.append(id_)
+                self.metadatas.append(metadata)
+                for field, postings in self._value_rows.items():
+                    postings.setdefault(metadata.get(field), []).append(start + offset)
+
+            self._write_manifest()
+            self._remap()
+            if self._centroids is not None:
+                self._assign_to_partitions(matrix, start)
+            return len(rows)
+
+    def update(self, ids: List[str], vectors: List[List[float]]) -> int:
+        """Overwrite the stored vectors of existing ids in place, ignoring unknown ids
+
+        Returns:
+            int: Number of vectors updated
+        """
+        with self._lock:
+            rows = [
+                (self.id_to_row[id_], vector)
+                for id_, vector in zip(ids, vectors)
+                if id_ in self.id_to_row
+            ]
+            if not rows:
+                return 0
+
+            matrix = self._normalize(np.asarray([vector for _, vector in rows], dtype=np.float32))
+            if matrix.shape[1] != self.dimension:
+                raise ValueError(f"Expected vectors of dimension {self.dimension}, got {matrix.shape[1]}")
+
+            with open(self.vectors_path, 'r+b') as f:
+                for (row, _), vector in zip(rows, matrix):
+                    f.seek(row * self.dimension * 4)
+                    f.write(vector.tobytes())
+            if self.quantization == "int8":
+                codes, scales = self._quantize(matrix)
+                with open(self.codes_path, 'r+b') as codes_file, open(self.scales_path, 'r+b') as scales_file:
+                    for (row, _), code, scale in zip(rows, codes, scales):
+                        codes_file.seek(row * self.dimension)
+                        codes_file.write(code.tobytes())
+                        scales_file.seek(row * 4)
+                        scales_file.write(scale.tobytes())
+
+            self._remap()
+            if self._centroids is not None:
+                # Move the updated rows to the partitions of their new vectors
+                assignments = np.argmax(matrix @ self._centroids.T, axis=1)
+                for (row, _), partition in zip(rows, assignments.tolist()):
+                    self._partitions[self._row_partitions[row]].remove(row)
+                    self._partitions[partition].append(row)
+                    self._row_partitions[row] = partition
+            return len(rows)
+
+    def get(self, id_: str) -> Optional[Tuple[np.ndarray, Dict]]:
+        """Return the stored (vector, metadata) for an id"""
+        with self._lock:
+            row = self.id_to_row.get(id_)
+            if row is None:
+                return None
+            return np.array(self._matrix[row]), self.metadatas[row]
+
+    def get_metadata(self, id_: str) -> Optional[Dict]:
+        """Return the stored metadata for an id"""
+        with self._lock:
+            row = self.id_to_row.get(id_)
+            return None if row is None else self.metadatas[row]
+
+    def _rows_where(self, where: Dict) -> np.ndarray:
+        """Rows whose metadata equals every field in where"""
+        matched = None
+        for field, value in where.items():
+            if field not in self._value_rows:
+                postings = {}
+                for row, metadata in enumerate(self.metadatas):
+                    postings.setdefault(metadata.get(field), []).append(row)
+                self._value_rows[field] = postings
+            rows = set(self._value_rows[field].get(value, ()))
+            matched = rows if matched is None else matched & rows
+        return np.asarray(sorted(matched or ()), dtype=np.int64)
+
+    def search(
+        self,
+        vector: List[float],
+        k: int,
+        where: Optional[Dict] = None
+    ) -> List[Tuple[str, float, Dict]]:
+        """Return the k most similar entries as (id, cosine similarity, metadata)
+
+        where restricts the search to entries whose metadata equals every
+        given field. Filtered partitions are scanned exhaustively.
+        """
+        with self._lock:
+            if self.count == 0 or k <= 0:
+                return []
+            query = self._normalize(np.asarray(vector, dtype=np.float32))
+
+            if where:
+                candidates = self._rows_where(where)
+                if not candidates.size:
+                    return []
+            else:
+                candidates = self._ivf_candidates(query) if self.count >= self.ivf_threshold else None
+                if candidates is not None and not candidates.size:
+                    candidates = None
+
+            if self.quantization == "int8":
+                # Shortlist on the int8 codes, then score the shortlist exactly
+                approximate = self._quantized_scores(query, candidates)
+                shortlist = self._top(approximate, k * self.rerank_factor)
+                candidates = np.sort(shortlist if candidates is None else candidates[shortlist])
+
+            if candidates is not None:
+                scores = self._matrix[candidates] @ query
+            else:
+                scores = self._matrix @ query
+
+            top = self._top(scores, k)
+            rows = candidates[top] if candidates is not None else top
+            return [
+                (self.ids[row], float(scores[pos]), self.metadatas[row])
+                for row, pos in zip(rows.tolist(), top.tolist())
+            ]
+
+    @staticmethod
+    def _top(scores: np.ndarray, k: int) -> np.ndarray:
+        """Positions of the k highest scores, best first"""
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])]
+
+    def _quantized_scores(
+        self,
+        query: np.ndarray,
+        rows: Optional[np.ndarray] = None,
+        block_size: int = 256
+    ) -> np.ndarray:
+        """Approximate cosine similarities from the int8 codes, block by block
+
+        Small blocks keep the float32 copy of each block in CPU cache.
+        """
+        n_rows = self.count if rows is None else rows.shape[0]
+        scores = np.empty(n_rows, dtype=np.float32)
+        for start in range(0, n_rows, block_size):
+            block = slice(start, start + block_size)
+            selected = block if rows is None else rows[block]
+            scores[block] = (self._codes[selected].astype(np.float32) @ query) * self._scales[selected]
+        return scores
+
+    def _ivf_candidates(self, query: np.ndarray) -> np.ndarray:
+        """Rows from the partitions whose centroids are closest to the query"""
+        # Rebuild once the index has doubled since the partitions were trained
+        if self._centroids is None or self.count >= 2 * self._ivf_built_at:
+            self._build_ivf()
+        nprobe = min(self.nprobe, len(self._partitions))
+        nearest = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+        rows = [row for partition in nearest for row in self._partitions[partition]]
+        return np.asarray(rows, dtype=np.int64)
+
+    def _build_ivf(self, iterations: int = 10, sample_per_list: int = 64, block_size: int = 8192):
+        """Train spherical k-means partitions over the stored vectors
+
+        Centroids are trained on a sample of at most sample_per_list rows per
+        partition and every row is then assigned block by block, so the full
+        float32 matrix is never loaded at once.
+        """
+        nlist = max(1, int(np.sqrt(self.count)))
+        rng = np.random.default_rng(0)
+        sample_size = min(self.count, nlist * sample_per_list)
+        data = np.asarray(self._matrix[np.sort(rng.choice(self.count, sample_size, replace=False))])
+        centroids = data[rng.choice(sample_size, nlist, replace=False)]
+        for _ in range(iterations):
+            assignments = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, data)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = self._normalize(sums)
+
+        self._centroids = centroids
+        self._partitions = [[] for _ in range(nlist)]
+        self._row_partitions = []
+        self._ivf_built_at = self.count
+        for start in range(0, self.count, block_size):
+            self._assign_to_partitions(np.asarray(self._matrix[start:start + block_size]), start)
+
+    def _assign_to_partitions(self, vectors: np.ndarray, start_row: int):
+        assignments = np.argmax(vectors @ self._centroids.T, axis=1)
+        for offset, partition in enumerate(assignments.tolist()):
+            self._partitions[partition].append(start_row + offset)
+            self._row_partitions.append(partition)
+
+    def clear(self):
+        """Remove every vector from the index"""
+        with self._lock:
+            self._matrix = np.empty((0, 0), dtype=np.float32)
+            self._codes = np.empty((0, 0), dtype=np.int8)
+            self._scales = np.empty(0, dtype=np.float32)
+            for path in (self.vectors_path, self.records_path, self.manifest_path,
+                     self.codes_path, self.scales_path):
+                if os.path.exists(path):
+                    os.unlink(path)
+            self.dimension = None
+            self.ids = []
+            self.metadatas = []
+            self.id_to_row = {}
+            self._value_rows = {}
+            self._reset_ivf()
@@ -0,0 +1,84 @@
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+from backend.numpy_index import NumpyVectorIndex
+from backend.vector_store import BaseQuestionVectorStore
+
+class NumpyQuestionVectorStore(BaseQuestionVectorStore):
+    def __init__(
+        self,
+        persist_directory: str = "backend/data/numpy_index",
+        embedding_backend: Optional[str] = None,
+        ivf_threshold: int = 4096,
+        quantization: Optional[str] = None
+    ):
+        """Initialize an in-process vector store for Marathi listening questions
+
+        Drop-in alternative to QuestionVectorStore that keeps each section in
+        a memory-mapped NumPy index instead of a ChromaDB collection. Indexes
+        are opened lazily on first use. similarity_score in search results is
+        the cosine distance (lower is more similar).
+
+        Args:
+            persist_directory: Directory holding one index per section
+            embedding_backend: "bedrock" or "local", defaults to the
+                EMBEDDING_BACKEND environment variable
+            ivf_threshold: Corpus size above which queries use IVF partitioning
+            quantization: "none" or "int8", defaults to the
+                VECTOR_QUANTIZATION environment variable
+        """
+        super().__init__(persist_directory, embedding_backend)
+
+        self.ivf_threshold = ivf_threshold
+        self.quantization = quantization or os.environ.get("VECTOR_QUANTIZATION", "none")
+        self.indexes = {}
+        self._indexes_lock = threading.Lock()
+
+    def _get_index(self, section_num: int) -> NumpyVectorIndex:
+        """Open the index for a section type on first use"""
+        self._check_section(section_num)
+
+        key = f"section{section_num}"
+        with self._indexes_lock:
+            if key not in self.indexes:
+                # Embedding dimensions differ between backends, so each backend gets its own indexes
+                self.indexes[key] = NumpyVectorIndex(
+                    os.path.join(self.persist_directory, f"{key}_{self.embedding_backend}"),
+                    ivf_threshold=self.ivf_threshold,
+                    quantization=self.quantization
+                )
+            return self.indexes[key]
+
+    def _count(self, section_num: int) -> int:
+        return self._get_index(section_num).count
+
+    def _list_entries(self, section_num: int) -> Tuple[List[str], List[Dict]]:
+        index = self._get_index(section_num)
+        return list(index.ids), list(index.metadatas)
+
+    def _add_entries(self, section_num, ids, documents, embeddings, metadatas):
+        self._get_index(section_num).add(ids, embeddings, metadatas)
+
+    def _update_embeddings(self, section_num: int, ids: List[str], embeddings: List[List[float]]):
+        self._get_index(section_num).update(ids, embeddings)
+
+    def _dense_search(self, section_num, embedding, k, where=None) -> List[Tuple[str, float]]:
+        return [
+            (id_, 1.0 - similarity)
+            for id_, similarity, _ in self._get_index(section_num).search(embedding, k, where)
+        ]
+
+    def _get_embeddings(self, section_num: int, ids: List[str]) -> List[Optional[List[float]]]:
+        index = self._get_index(section_num)
+        return [None if entry is None else entry[0] for entry in map(index.get, ids)]
+
+    def _get_metadatas(self, section_num: int, ids: List[str]) -> List[Optional[Dict]]:
+        index = self._get_index(section_num)
+        return [index.get_metadata(id_) for id_ in ids]
+
+    def _existing_ids(self, section_num: int, ids: List[str]) -> List[str]:
+        index = self._get_index(section_num)
+        return [id_ for id_ in ids if id_ in index.id_to_row]
+
+    def _clear(self, section_num: int):
+        self._get_index(section_num).clear()
@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+class QuestionBuffer:
+    def __init__(
+        self,
+        generate_fn: Callable[[str, str, int], List[Dict]],
+        path: str,
+        capacity: int = 2,
+        workers: int = 2,
+        retry_delay: float = 30.0
+    ):
+        """Initialize a persistent buffer of pre-generated questions
+
+        Background workers keep up to capacity ready questions for every
+        (practice_type, topic) pair, refilling a pair after each pop. The
+        buffer is saved to disk on every change, so ready questions survive
+        restarts.
+
+        Args:
+            generate_fn: Called with (practice_type, topic, count), returns
+                up to count validated questions, an empty list when
+                generation failed
+            path: JSON file the buffered questions are persisted to
+            capacity: Ready questions kept per pair
+            workers: Number of generation threads
+            retry_delay: Seconds before a pair is retried after a failed
+                generation
+        """
+        self.generate_fn = generate_fn
+        self.path = path
+        self.capacity = capacity
+        self.workers = max(1, workers)
+        self.retry_delay = retry_delay
+        self.generated = 0
+        self.failed = 0
+
+        self._cond = threading.Condition()
+        self._keys: List[Tuple[str, str]] = []
+        self._cursor = 0
+        self._in_flight: Dict[Tuple[str, str], int] = {}
+        self._retry_at: Dict[Tuple[str, str], float] = {}
+        self._threads: List[threading.Thread] = []
+        self._stopped = False
+        self.buffers: Dict[Tuple[str, str], List[Dict]] = self._load()
+
+    def _load(self) -> Dict[Tuple[str, str], List[Dict]]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            return {
+                (entry['practice_type'], entry['topic']): entry['questions']
+                for entry in stored
+            }
+        except Exception as e:
+            print(f"Ignoring unreadable question buffer {self.path}: {str(e)}")
+            return {}
+
+    def _save(self):
+        """Atomically persist the buffered questions, called with the lock held"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump([
+                {"practice_type": practice_type, "topic": topic, "questions": questions}
+                for (practice_type, topic), questions in self.buffers.items()
+                if questions
+            ], f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def size(self, practice_type: str, topic: str) -> int:
+        """Number of ready questions for a pair"""
+        with self._cond:
+            return len(self.buffers.get((practice_type, topic), []))
+
+    def pop(self, practice_type: str, topic: str) -> Optional[Dict]:
+        """Take a ready question for a pair, or None when its buffer is empty"""
+        key = (practice_type, topic)
+        with self._cond:
+            questions = self.buffers.get(key)
+            question = questions.pop(0) if questions else None
+            if question is not None:
+                self._save()
+            # Pairs outside the configured list are buffered once requested
+            if key not in self._keys:
+                self._keys.append(key)
+            self._cond.notify_all()
+        return question
+
+    def start(self, keys: List[Tuple[str, str]]):
+        """Start filling the buffers of the given (practice_type, topic) pairs"""
+        with self._cond:
+            for key in keys:
+                if key not in self._keys:
+                    self._keys.append(key)
+            self._stopped = False
+            self._cond.notify_all()
+
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._run, name="question-buffer", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Stop the workers after their current generation"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _next_key(self) -> Optional[Tuple[Tuple[str, str], int]]:
+        """Wait for a pair below capacity, visiting pairs round robin
+
+        Returns:
+            tuple: The pair and how many questions it is missing
+        """
+        with self._cond:
+            while not self._stopped:
+                now = time.time()
+                wake_at = None
+                for offset in range(len(self._keys)):
+                    key = self._keys[(self._cursor + offset) % len(self._keys)]
+                    queued = len(self.buffers.get(key, [])) + self._in_flight.get(key, 0)
+                    if queued >= self.capacity:
+                        continue
+                    retry_at = self._retry_at.get(key, 0)
+                    if retry_at > now:
+                        wake_at = retry_at if wake_at is None else min(wake_at, retry_at)
+                        continue
+                    self._cursor = (self._cursor + offset + 1) % len(self._keys)
+                    count = self.capacity - queued
+                    self._in_flight[key] = self._in_flight.get(key, 0) + count
+                    return key, count
+                self._cond.wait(None if wake_at is None else wake_at - now)
+            return None
+
+    def _run(self):
+        while True:
+            job = self._next_key()
+            if job is None:
+                return
+            key, count = job
+
+            # The missing questions are requested together, so one model call
+            # can fill the whole pair
+            try:
+                questions = self.generate_fn(key[0], key[1], count)[:count]
+            except Exception as e:
+                print(f"Error pre-generating questions for {key}: {str(e)}")
+                questions = []
+
+            with self._cond:
+                self._in_flight[key] -= count
+                if questions:
+                    self.buffers.setdefault(key, []).extend(questions)
+                    self._retry_at.pop(key, None)
+                    self.generated += len(questions)
+                    self._save()
+                else:
+                    self._retry_at[key] = time.time() + self.retry_delay
+                    self.failed += 1
+                self._cond.notify_all()
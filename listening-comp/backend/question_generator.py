@@ -1,66 +1,276 @@
 import boto3
 import json
-from typing import Dict, List, Optional
-from backend.vector_store import QuestionVectorStore
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from backend.context_builder import FewShotContextBuilder
+from backend.llm_cache import converse_cached
+from backend.question_parser import (
+    QUESTION_SCHEMAS, IncrementalQuestionParser, normalize_question, parse_answer_number, parse_question, repair_json
+)
+from backend.vector_store import get_vector_store
+
+# Placeholders once filled in when the model did not return 4 options,
+# questions still carrying them are rejected
+PLACEHOLDER_OPTIONS = [
+    "पहिला पर्याय",
+    "दुसरा पर्याय",
+    "तिसरा पर्याय",
+    "चौथा पर्याय"
+]
+
+# Sectioned text format, used when QUESTION_OUTPUT_FORMAT is "text"
+TEXT_FORMATS = {
+    2: """
+            Format the response exactly like this:
+            
+            Introduction:
+            [introduction text in Marathi]
+            
+            Conversation:
+            [conversation text in Marathi]
+            
+            Question:
+            [question text in Marathi]
+            
+            Options:
+            1. [first option in Marathi]
+            2. [second option in Marathi]
+            3. [third option in Marathi]
+            4. [fourth option in Marathi]
+            
+            Correct Answer:
+            [number of the correct option, 1-4]
+            """,
+    3: """
+            Format the response exactly like this:
+            
+            Situation:
+            [situation text in Marathi]
+            
+            Question:
+            काय म्हणाल?
+            
+            Options:
+            1. [first phrase in Marathi]
+            2. [second phrase in Marathi]
+            3. [third phrase in Marathi]
+            4. [fourth phrase in Marathi]
+            
+            Correct Answer:
+            [number of the most appropriate phrase, 1-4]
+            """
+}
+
+REQUIRED_FIELDS = {
+    2: ('Introduction', 'Conversation', 'Question'),
+    3: ('Situation', 'Question')
+}
+
+def is_valid_question(section_num: int, question: Optional[Dict]) -> bool:
+    """Check that a generated question is complete enough to show to a learner
+
+    Rejects missing fields, placeholder options, duplicate options and
+    questions without a CorrectAnswer.
+    """
+    if not question or parse_answer_number(question.get('CorrectAnswer')) is None:
+        return False
+    if any(not str(question.get(field, '')).strip() for field in REQUIRED_FIELDS[section_num]):
+        return False
+    options = [str(option).strip() for option in question.get('Options', [])]
+    return (
+        len(options) == 4
+        and all(options)
+        and len(set(options)) == 4
+        and options != PLACEHOLDER_OPTIONS
+    )
+
+def check_answer(question: Dict, selected_answer: int) -> Optional[bool]:
+    """Decide locally whether the selected 1-based option is correct
+
+    Returns None for questions stored without a CorrectAnswer.
+    """
+    correct_answer = parse_answer_number(question.get('CorrectAnswer'))
+    if correct_answer is None:
+        return None
+    return selected_answer == correct_answer
+
+def precomputed_explanation(question: Dict, selected_answer: int) -> Optional[str]:
+    """Return the stored explanation of the selected 1-based option, if any"""
+    explanations = question.get('Explanations')
+    if not isinstance(explanations, list) or len(explanations) != 4 or not 1 <= selected_answer <= 4:
+        return None
+    return explanations[selected_answer - 1] or None
+
+def _is_json_object(response: str) -> bool:
+    """True for a response that parses as a JSON object"""
+    try:
+        return isinstance(json.loads(response.strip()), dict)
+    except ValueError:
+        return False
+
+def _parse_explanations(response: str) -> Optional[List[str]]:
+    """Parse a JSON array of four option explanations, None if malformed"""
+    explanations = repair_json(response)
+    if (not isinstance(explanations, list) or len(explanations) != 4
+            or not all(isinstance(text, str) and text.strip() for text in explanations)):
+        return None
+    return [text.strip() for text in explanations]
 
 class QuestionGenerator:
     def __init__(self):
         """Initialize Bedrock client and vector store"""
         self.bedrock_client = boto3.client('bedrock-runtime', region_name="us-east-1")
-        self.vector_store = QuestionVectorStore()
+        self.vector_store = get_vector_store()
         self.model_id = "anthropic.claude-3-5-sonnet-20240620-v1:0"
+        # "json" asks for a JSON object matching QUESTION_SCHEMAS, "text" for
+        # the sectioned format, the parser accepts either
+        self.output_format = os.environ.get("QUESTION_OUTPUT_FORMAT", "json")
+        # Raw responses are appended here when set, for the parser benchmark corpus
+        self.response_log = os.environ.get("QUESTION_RESPONSE_LOG")
+        self._response_log_lock = threading.Lock()
+        # Retrieve a wider pool than the examples used, so the context
+        # builder can trade relevance for diversity within its token budget
+        self.example_candidates = int(os.environ.get("FEW_SHOT_CANDIDATES", 6))
+        self.context_builder = FewShotContextBuilder(
+            token_budget=int(os.environ.get("FEW_SHOT_TOKEN_BUDGET", 1200))
+        )
+
+    def _format_instructions(self, section_num: int) -> str:
+        """Describe the expected response format for a single question"""
+        if self.output_format == "text":
+            return TEXT_FORMATS[section_num]
+        schema = json.dumps(QUESTION_SCHEMAS[section_num], ensure_ascii=False, indent=2)
+        return f"""
+            Return ONLY a JSON object, without markdown, matching this JSON schema:
+            {schema}
+            """
 
-    def _invoke_bedrock(self, prompt: str) -> Optional[str]:
-        """Invoke Bedrock with the given prompt"""
+    def _record_response(self, section_num: int, response: str):
+        """Append a raw question response to the response log, when enabled"""
+        if not self.response_log:
+            return
         try:
-            messages = [{
-                "role": "user",
-                "content": [{
-                    "text": prompt
-                }]
-            }]
-            
-            response = self.bedrock_client.converse(
+            with self._response_log_lock, open(self.response_log, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({
+                    "section": section_num,
+                    "format": self.output_format,
+                    "response": response
+                }, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Error recording question response: {str(e)}")
+
+    def _invoke_bedrock(
+        self,
+        prompt: str,
+        bypass_cache: bool = False,
+        validate: Optional[Callable[[str], bool]] = None
+    ) -> Optional[str]:
+        """Invoke Bedrock with the given prompt
+
+        Responses are cached by prompt, pass bypass_cache for calls that
+        should sample a fresh answer every time, and validate to cache only
+        responses the caller can use.
+        """
+        try:
+            return converse_cached(
+                self.bedrock_client,
+                self.model_id,
+                prompt,
+                {"temperature": 0.7},
+                bypass_cache=bypass_cache,
+                validate=validate
+            )
+        except Exception as e:
+            print(f"Error invoking Bedrock: {str(e)}")
+            return None
+
+    def _stream_question(
+        self,
+        section_num: int,
+        prompt: str,
+        on_section: Callable[[str, Any], None]
+    ) -> Optional[Dict]:
+        """Generate a question with converse_stream, reporting each section as it completes"""
+        parser = IncrementalQuestionParser(on_section)
+        chunks = []
+        try:
+            response = self.bedrock_client.converse_stream(
                 modelId=self.model_id,
-                messages=messages,
+                messages=[{
+                    "role": "user",
+                    "content": [{
+                        "text": prompt
+                    }]
+                }],
                 inferenceConfig={"temperature": 0.7}
             )
-            
-            return response['output']['message']['content'][0]['text']
+            for event in response['stream']:
+                text = event.get('contentBlockDelta', {}).get('delta', {}).get('text')
+                if text:
+                    parser.feed(text)
+                    chunks.append(text)
         except Exception as e:
-            print(f"Error invoking Bedrock: {str(e)}")
+            print(f"Error streaming from Bedrock: {str(e)}")
+            return None
+        
+        if not chunks:
             return None
+        self._record_response(section_num, ''.join(chunks))
+        return parser.finish()
 
-    def generate_similar_question(self, section_num: int, topic: str) -> Dict:
-        """Generate a new question similar to existing ones on a given topic"""
+    def _generate_from_prompt(
+        self,
+        section_num: int,
+        prompt: str,
+        on_section: Optional[Callable[[str, Any], None]] = None
+    ) -> Optional[Dict]:
+        """Generate and parse a question, streaming sections to on_section when given
+
+        A question that fails is_valid_question, e.g. one without a valid
+        CorrectAnswer, is generated again once. Returns None when the retry
+        fails too.
+        """
+        for attempt in range(2):
+            if on_section is not None:
+                question = self._stream_question(section_num, prompt, on_section)
+            else:
+                # Each call should produce a different question, so skip the response cache
+                response = self._invoke_bedrock(prompt, bypass_cache=True)
+                if not response:
+                    return None
+                self._record_response(section_num, response)
+                question = self._parse_question_response(response)
+            
+            if is_valid_question(section_num, question):
+                return question
+            print(f"Attempt {attempt + 1}: generated question is incomplete or has no valid answer key")
+        return None
+
+    def generate_similar_question(
+        self,
+        section_num: int,
+        topic: str,
+        on_section: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict:
+        """Generate a new question similar to existing ones on a given topic
+
+        Args:
+            section_num: Section type, 2 or 3
+            topic: Topic of the question
+            on_section: Optional callback receiving (section name, value) as
+                each section of a streamed response completes
+        """
         # Get similar questions for context
-        similar_questions = self.vector_store.search_similar_questions(section_num, topic, n_results=3)
+        similar_questions = self.vector_store.search_similar_questions(
+            section_num, topic, n_results=self.example_candidates, topic=topic
+        )
         
         if not similar_questions:
             # If no similar questions found, generate a new one from scratch
-            return self.generate_new_question(section_num, topic)
+            return self.generate_new_question(section_num, topic, on_section)
         
-        # Create context from similar questions
-        context = "Here are some example Marathi listening questions:\n\n"
-        for idx, q in enumerate(similar_questions, 1):
-            if section_num == 2:
-                context += f"Example {idx}:\n"
-                context += f"Introduction: {q.get('Introduction', '')}\n"
-                context += f"Conversation: {q.get('Conversation', '')}\n"
-                context += f"Question: {q.get('Question', '')}\n"
-                if 'Options' in q:
-                    context += "Options:\n"
-                    for i, opt in enumerate(q['Options'], 1):
-                        context += f"{i}. {opt}\n"
-            else:  # section 3
-                context += f"Example {idx}:\n"
-                context += f"Situation: {q.get('Situation', '')}\n"
-                context += f"Question: {q.get('Question', '')}\n"
-                if 'Options' in q:
-                    context += "Options:\n"
-                    for i, opt in enumerate(q['Options'], 1):
-                        context += f"{i}. {opt}\n"
-            context += "\n"
+        context = self._build_examples_context(section_num, similar_questions)
 
         # Create prompt for generating new question
         prompt = f"""Based on the following example Marathi listening questions, create a new question about {topic}.
@@ -69,22 +279,28 @@ class QuestionGenerator:
         
         {context}
         
-        Generate a new question following the exact same format as above. Include all components (Introduction/Situation, 
-        Conversation/Question, and Options). Make sure the question is challenging but fair, and the options are plausible 
-        but with only one clearly correct answer. Return ONLY the question without any additional text.
-        
-        New Question:
+        Generate a new question with the same components as the examples (Introduction/Situation, 
+        Conversation/Question, Options and Correct Answer). Make sure the question is challenging but fair, and the 
+        options are plausible but with only one clearly correct answer. Return ONLY the question without any additional text.
         """
+        prompt += self._format_instructions(section_num)
 
-        # Generate new question
-        response = self._invoke_bedrock(prompt)
-        if not response:
-            return None
+        # Generate and parse the new question, falling back to a default one
+        question = self._generate_from_prompt(section_num, prompt, on_section)
+        if not question:
+            return self._create_default_question(section_num, topic)
+        return question
 
-        # Parse the generated question
-        return self._parse_question_response(response)
+    def _build_examples_context(self, section_num: int, similar_questions: List[Dict]) -> str:
+        """Create the few-shot context from similar questions, within the token budget"""
+        return self.context_builder.build(section_num, similar_questions)
 
-    def generate_new_question(self, section_num: int, topic: str) -> Dict:
+    def generate_new_question(
+        self,
+        section_num: int,
+        topic: str,
+        on_section: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict:
         """Generate a new question from scratch when no similar questions are available"""
         template = ""
         if section_num == 2:
@@ -96,23 +312,7 @@ class QuestionGenerator:
             2. Conversation: A dialogue between two people (in Marathi)
             3. Question: What the listener needs to determine (in Marathi)
             4. Options: Four possible answers in Marathi, with only one correct answer
-            
-            Format the response exactly like this:
-            
-            Introduction:
-            [introduction text in Marathi]
-            
-            Conversation:
-            [conversation text in Marathi]
-            
-            Question:
-            [question text in Marathi]
-            
-            Options:
-            1. [first option in Marathi]
-            2. [second option in Marathi]
-            3. [third option in Marathi]
-            4. [fourth option in Marathi]
+            5. Correct Answer: The number of the correct option
             """
         else:  # section 3
             template = """
@@ -122,94 +322,96 @@ class QuestionGenerator:
             1. Situation: A scenario where the listener needs to choose an appropriate phrase (in Marathi)
             2. Question: Usually "काय म्हणाल?" (What would you say?) in Marathi
             3. Options: Four possible phrases in Marathi, with only one being the most appropriate
-            
-            Format the response exactly like this:
-            
-            Situation:
-            [situation text in Marathi]
-            
-            Question:
-            काय म्हणाल?
-            
-            Options:
-            1. [first phrase in Marathi]
-            2. [second phrase in Marathi]
-            3. [third phrase in Marathi]
-            4. [fourth phrase in Marathi]
+            4. Correct Answer: The number of the most appropriate phrase
             """
         
-        prompt = template.format(topic=topic)
-        response = self._invoke_bedrock(prompt)
+        prompt = template.format(topic=topic) + self._format_instructions(section_num)
+        question = self._generate_from_prompt(section_num, prompt, on_section)
         
-        if not response:
+        if not question:
             # Create a default question if generation fails
             return self._create_default_question(section_num, topic)
             
-        return self._parse_question_response(response)
+        return question
+
+    def generate_batch(self, section_num: int, topic: str, n: int) -> List[Dict]:
+        """Generate up to n distinct questions on a topic with a single model call
+
+        The few-shot examples are sent once for the whole batch. Questions
+        that fail validation or repeat another question in the batch are
+        dropped, so fewer than n may be returned.
+        """
+        if n <= 0:
+            return []
+        
+        similar_questions = self.vector_store.search_similar_questions(
+            section_num, topic, n_results=self.example_candidates, topic=topic
+        )
+        context = self._build_examples_context(section_num, similar_questions) if similar_questions else ""
+        fields = REQUIRED_FIELDS[section_num] + ('Options', 'CorrectAnswer')
+        if section_num == 2:
+            description = ("Introduction sets up the scenario, Conversation is a dialogue between two people "
+                           "and Question asks what the listener needs to determine")
+        else:
+            description = ("Situation describes where the listener needs to choose an appropriate phrase "
+                           "and Question is usually \"काय म्हणाल?\"")
+        
+        prompt = f"""Create {n} different Marathi listening practice questions about {topic}.
+        Each question should test listening comprehension, cover a different scenario and have exactly one
+        clearly correct answer among plausible options.
+        
+        {context}
+        
+        Return ONLY a JSON array of {n} objects with the keys {", ".join(fields)}.
+        {description}. Options is a list of four answer texts without numbering and
+        CorrectAnswer is the number (1-4) of the correct option. All text must be in Marathi.
+        """
+        
+        # Every batch should contain new questions, so skip the response cache
+        response = self._invoke_bedrock(prompt, bypass_cache=True)
+        if not response:
+            return []
+        return self._parse_batch_response(section_num, response)
+
+    def _parse_batch_response(self, section_num: int, response: str) -> List[Dict]:
+        """Parse and validate the questions of a batch response"""
+        items = repair_json(response)
+        if isinstance(items, dict):
+            # A single question, or the array wrapped in an object
+            items = next((value for value in items.values() if isinstance(value, list)), [items])
+        if not isinstance(items, list):
+            print("Error parsing question batch: no JSON array in response")
+            return []
+        
+        questions = []
+        seen = set()
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            normalized = normalize_question(item)
+            question = {field: normalized.get(field, '') for field in REQUIRED_FIELDS[section_num]}
+            question['Options'] = normalized.get('Options', [])
+            question['CorrectAnswer'] = normalized.get('CorrectAnswer')
+            if not is_valid_question(section_num, question):
+                continue
+            # Drop repeats of a question already in the batch
+            key = tuple(question[field] for field in REQUIRED_FIELDS[section_num])
+            if key in seen:
+                continue
+            seen.add(key)
+            questions.append(question)
+        
+        if len(questions) < len(items):
+            print(f"Dropped {len(items) - len(questions)} invalid or repeated question(s) from batch")
+        return questions
 
-    def _parse_question_response(self, response: str) -> Dict:
-        """Parse the generated question response"""
+    def _parse_question_response(self, response: str) -> Optional[Dict]:
+        """Parse the generated question response, None if it cannot be parsed"""
         try:
-            lines = response.strip().split('\n')
-            question = {}
-            current_key = None
-            current_value = []
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                if line.startswith("Introduction:"):
-                    if current_key:
-                        question[current_key] = ' '.join(current_value)
-                    current_key = 'Introduction'
-                    current_value = [line.replace("Introduction:", "").strip()]
-                elif line.startswith("Conversation:"):
-                    if current_key:
-                        question[current_key] = ' '.join(current_value)
-                    current_key = 'Conversation'
-                    current_value = [line.replace("Conversation:", "").strip()]
-                elif line.startswith("Situation:"):
-                    if current_key:
-                        question[current_key] = ' '.join(current_value)
-                    current_key = 'Situation'
-                    current_value = [line.replace("Situation:", "").strip()]
-                elif line.startswith("Question:"):
-                    if current_key:
-                        question[current_key] = ' '.join(current_value)
-                    current_key = 'Question'
-                    current_value = [line.replace("Question:", "").strip()]
-                elif line.startswith("Options:"):
-                    if current_key:
-                        question[current_key] = ' '.join(current_value)
-                    current_key = 'Options'
-                    current_value = []
-                elif line[0].isdigit() and line[1] == "." and current_key == 'Options':
-                    current_value.append(line[2:].strip())
-                elif current_key:
-                    current_value.append(line)
-            
-            if current_key:
-                if current_key == 'Options':
-                    question[current_key] = current_value
-                else:
-                    question[current_key] = ' '.join(current_value)
-            
-            # Ensure we have exactly 4 options
-            if 'Options' not in question or len(question.get('Options', [])) != 4:
-                # Use default options if we don't have exactly 4
-                question['Options'] = [
-                    "पहिला पर्याय",
-                    "दुसरा पर्याय",
-                    "तिसरा पर्याय",
-                    "चौथा पर्याय"
-                ]
-            
-            return question
+            return parse_question(response.strip())
         except Exception as e:
             print(f"Error parsing generated question: {str(e)}")
-            return self._create_default_question(2, "default") # Default to section 2
+            return None
             
     def _create_default_question(self, section_num: int, topic: str) -> Dict:
         """Create a default question when generation fails"""
@@ -223,7 +425,8 @@ class QuestionGenerator:
                     'केळी, सफरचंद आणि द्राक्षे',
                     'सफरचंद, संत्री आणि द्राक्षे',
                     'केळी, संत्री आणि द्राक्षे'
-                ]
+                ],
+                'CorrectAnswer': 1
             }
         else:  # section 3
             return {
@@ -234,14 +437,31 @@ class QuestionGenerator:
                     'तुमचे घर कुठे आहे?',
                     'मला घरी जायचे आहे.',
                     'तुम्ही कोणत्या घरात राहता?'
-                ]
+                ],
+                'CorrectAnswer': 1
             }
 
     def get_feedback(self, question: Dict, selected_answer: int) -> Dict:
-        """Generate feedback for the selected answer"""
+        """Generate feedback for the selected answer
+
+        Questions generated with a CorrectAnswer are checked locally. Their
+        explanation comes from the precomputed Explanations, or is left as
+        None for get_explanation to fill in later. Older questions without
+        an answer key are judged by the model, its correct_answer is None
+        when the response has no valid option number.
+        """
         if not question or 'Options' not in question:
             return None
 
+        correct = check_answer(question, selected_answer)
+        if correct is not None:
+            # Serve the explanation precomputed at generation time when there is one
+            return {
+                "correct": correct,
+                "explanation": precomputed_explanation(question, selected_answer),
+                "correct_answer": parse_answer_number(question['CorrectAnswer'])
+            }
+
         # Create prompt for generating feedback
         prompt = f"""Given this Marathi listening question and the selected answer, provide feedback explaining if it's correct 
         and why. Keep the explanation clear and concise.
@@ -265,18 +485,101 @@ class QuestionGenerator:
         prompt += "- correct_answer: the number of the correct option (1-4)\n"
 
         # Get feedback
-        response = self._invoke_bedrock(prompt)
+        response = self._invoke_bedrock(prompt, validate=_is_json_object)
         if not response:
             return None
 
         try:
             # Parse the JSON response
             feedback = json.loads(response.strip())
-            return feedback
-        except:
-            # If JSON parsing fails, return a basic response with a default correct answer
+        except ValueError:
+            feedback = None
+        if not isinstance(feedback, dict):
+            # Without a judgement the correct option is unknown, do not guess one
             return {
                 "correct": False,
                 "explanation": "प्रतिसाद मिळवताना त्रुटी आली. कृपया पुन्हा प्रयत्न करा.",
-                "correct_answer": 1  # Default to first option
-            }
\ No newline at end of file
+                "correct_answer": None
+            }
+        
+        correct_answer = parse_answer_number(feedback.get('correct_answer'))
+        feedback['correct_answer'] = correct_answer
+        if correct_answer is not None:
+            feedback['correct'] = selected_answer == correct_answer
+        return feedback
+
+    def get_explanation(self, question: Dict, selected_answer: int) -> Optional[str]:
+        """Explain in Marathi why the selected option is or is not correct
+
+        Only needed for questions with a CorrectAnswer, the answer itself
+        is already known. Responses are cached, so learners choosing the
+        same option share one explanation.
+        """
+        correct_answer = parse_answer_number(question.get('CorrectAnswer'))
+        if correct_answer is None:
+            return None
+
+        # The precomputed explanations may have arrived after the answer was checked
+        explanation = precomputed_explanation(question, selected_answer)
+        if explanation:
+            return explanation
+
+        prompt = f"""Explain briefly, in Marathi, why the selected answer to this Marathi listening question is
+        {'correct' if selected_answer == correct_answer else 'incorrect'}. Keep the explanation clear and concise
+        and return only the explanation.
+        
+        """
+        prompt += self._format_answered_question(question, correct_answer)
+        prompt += f"Selected Answer: {selected_answer}\n"
+
+        response = self._invoke_bedrock(prompt, validate=lambda text: bool(text.strip()))
+        return response.strip() if response else None
+
+    def generate_explanations(self, question: Dict) -> Optional[List[str]]:
+        """Explain every option of a question with a single model call
+
+        Meant to run once when a question is generated, so that answers can
+        be explained without any further model calls. The result is stored
+        as the question's Explanations.
+
+        Returns:
+            list: One Marathi explanation per option, in option order, or
+                None when the question has no answer key or the response
+                could not be parsed
+        """
+        correct_answer = parse_answer_number(question.get('CorrectAnswer'))
+        if correct_answer is None or len(question.get('Options', [])) != 4:
+            return None
+
+        prompt = """For each of the four options of this Marathi listening question, explain briefly in Marathi
+        why choosing it is correct or incorrect.
+        
+        """
+        prompt += self._format_answered_question(question, correct_answer)
+        prompt += "\nReturn ONLY a JSON array of four strings, one explanation per option in option order.\n"
+
+        response = self._invoke_bedrock(
+            prompt, validate=lambda text: _parse_explanations(text) is not None
+        )
+        if not response:
+            return None
+        explanations = _parse_explanations(response)
+        if explanations is None:
+            print("Error parsing option explanations: expected a JSON array of four strings")
+        return explanations
+
+    def _format_answered_question(self, question: Dict, correct_answer: int) -> str:
+        """Describe a question and its answer key for explanation prompts"""
+        if 'Introduction' in question:
+            text = f"Introduction: {question['Introduction']}\n"
+            text += f"Conversation: {question['Conversation']}\n"
+        else:
+            text = f"Situation: {question['Situation']}\n"
+        
+        text += f"Question: {question['Question']}\n"
+        text += "Options:\n"
+        for i, opt in enumerate(question['Options'], 1):
+            text += f"{i}. {opt}\n"
+        
+        text += f"\nCorrect Answer: {correct_answer}\n"
+        return text
\ No newline at end of file
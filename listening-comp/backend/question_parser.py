@@ -0,0 +1,404 @@
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Section headers in the order the generation prompts ask for them, mapped
+# to the question field they fill
+SECTION_HEADERS = {
+    'Introduction': 'Introduction',
+    'Conversation': 'Conversation',
+    'Situation': 'Situation',
+    'Question': 'Question',
+    'Options': 'Options',
+    'Correct Answer': 'CorrectAnswer'
+}
+
+# JSON schemas sent with structured-output prompts, by section
+_OPTIONS_SCHEMA = {
+    "type": "array",
+    "items": {"type": "string"},
+    "minItems": 4,
+    "maxItems": 4,
+    "description": "Four answer texts in Marathi, without numbering"
+}
+_CORRECT_ANSWER_SCHEMA = {
+    "type": "integer",
+    "minimum": 1,
+    "maximum": 4,
+    "description": "Number of the correct option"
+}
+QUESTION_SCHEMAS = {
+    2: {
+        "type": "object",
+        "properties": {
+            "Introduction": {"type": "string", "description": "Brief setup of the scenario in Marathi"},
+            "Conversation": {"type": "string", "description": "Dialogue between two people in Marathi"},
+            "Question": {"type": "string", "description": "What the listener needs to determine, in Marathi"},
+            "Options": _OPTIONS_SCHEMA,
+            "CorrectAnswer": _CORRECT_ANSWER_SCHEMA
+        },
+        "required": ["Introduction", "Conversation", "Question", "Options", "CorrectAnswer"],
+        "additionalProperties": False
+    },
+    3: {
+        "type": "object",
+        "properties": {
+            "Situation": {"type": "string", "description": "Scenario needing an appropriate phrase, in Marathi"},
+            "Question": {"type": "string", "description": "Usually \"काय म्हणाल?\""},
+            "Options": _OPTIONS_SCHEMA,
+            "CorrectAnswer": _CORRECT_ANSWER_SCHEMA
+        },
+        "required": ["Situation", "Question", "Options", "CorrectAnswer"],
+        "additionalProperties": False
+    }
+}
+
+_DEVANAGARI_DIGITS = str.maketrans('०१२३४५६७८९', '0123456789')
+
+# Headers may come wrapped in markdown, e.g. "**Options:**" or "### Question:"
+_HEADER_RE = re.compile(
+    r'^[#>*_\s]*(' + '|'.join(header.replace(' ', r'\s*') for header in SECTION_HEADERS) + r')[*_\s]*[:：][*_\s]*(.*)$',
+    re.IGNORECASE
+)
+# Option numbering such as "1.", "1)", "(1)", "१.", "a)" or a bullet. The
+# marker must be followed by whitespace, so times and decimals such as
+# "१०.३० वाजता" or "2.5 किलो" keep their digits
+_OPTION_RE = re.compile(
+    r'^[\s*_>]*(?:[(\[]?(?P<marker>[0-9०-९]{1,2}|[a-dA-D])[.)\]]|[-•*])[*_]*(?:\s+|$)(?P<text>.*)$'
+)
+
+# Normalized spellings of the question fields, for keys of JSON responses
+_KEY_ALIASES = {
+    'introduction': 'Introduction',
+    'intro': 'Introduction',
+    'conversation': 'Conversation',
+    'dialogue': 'Conversation',
+    'situation': 'Situation',
+    'question': 'Question',
+    'questiontext': 'Question',
+    'options': 'Options',
+    'choices': 'Options',
+    'correctanswer': 'CorrectAnswer',
+    'correctoption': 'CorrectAnswer',
+    'answer': 'CorrectAnswer'
+}
+
+def parse_answer_number(value: Any) -> Optional[int]:
+    """Read a 1-4 option number from a model answer such as 3, "3", "३" or "3. ..." """
+    if isinstance(value, int) and not isinstance(value, bool):
+        number = value
+    else:
+        match = re.search(r'\d+', str(value).translate(_DEVANAGARI_DIGITS))
+        if not match:
+            return None
+        number = int(match.group())
+    return number if 1 <= number <= 4 else None
+
+def _clean_text(text: Any) -> str:
+    """Strip markdown emphasis and surrounding whitespace from a value"""
+    return re.sub(r'\*\*|__', '', str(text)).strip().strip('*').strip()
+
+def _strip_option_numbering(text: Any) -> str:
+    match = _OPTION_RE.match(str(text))
+    return _clean_text(match.group('text') if match else text)
+
+def _strip_list_numbering(options: List[Any]) -> List[str]:
+    """Clean the options of a JSON list, which are asked for without numbering
+
+    Markers are only removed when every option carries one and they count
+    1, 2, 3... or a, b, c... in order, so option texts that merely start
+    with a number are left alone.
+    """
+    matches = [_OPTION_RE.match(str(option)) for option in options]
+    markers = [match.group('marker') if match else None for match in matches]
+    numbered = [str(i) for i in range(1, len(options) + 1)]
+    lettered = [chr(ord('a') + i) for i in range(len(options))]
+    if options and all(markers) and (
+        [marker.translate(_DEVANAGARI_DIGITS) for marker in markers] == numbered
+        or [marker.lower() for marker in markers] == lettered
+    ):
+        return [_clean_text(match.group('text')) for match in matches]
+    return [_clean_text(option) for option in options]
+
+def repair_json(text: str) -> Optional[Any]:
+    """Parse the first JSON object or array in a model response, repairing it if needed
+
+    Single pass over the text that skips code fences and surrounding prose,
+    drops trailing commas, escapes raw newlines inside strings, accepts
+    curly quotes outside strings and closes a value cut off at the end. A
+    member that was only partly written is dropped.
+
+    Returns:
+        The parsed value, or None when no JSON value could be recovered
+    """
+    starts = [index for index in (text.find('{'), text.find('[')) if index >= 0]
+    if not starts:
+        return None
+
+    out: List[str] = []
+    stack: List[str] = []
+    # (output length, open containers) after each complete member
+    cut_points = []
+    in_string = escaped = curly = False
+    for char in text[min(starts):]:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"' or (curly and char == '”'):
+                in_string = False
+                char = '"'
+            elif char == '\n':
+                char = '\\n'
+            out.append(char)
+            continue
+
+        if char in '"“”':
+            # Strings opened with a curly quote are closed by one too
+            in_string = True
+            curly = char != '"'
+            out.append('"')
+        elif char in '{[':
+            stack.append('}' if char == '{' else ']')
+            out.append(char)
+        elif char in '}]':
+            while out and out[-1] in ' \t\r\n,':
+                out.pop()
+            if not stack:
+                break
+            out.append(stack.pop())
+            if not stack:
+                break
+            cut_points.append((len(out), list(stack)))
+        elif char == ',':
+            cut_points.append((len(out), list(stack)))
+            out.append(char)
+        else:
+            out.append(char)
+
+    repaired = ''.join(out)
+    if in_string:
+        repaired += '"'
+    candidates = [repaired.rstrip().rstrip(',') + ''.join(reversed(stack))]
+    candidates += [
+        ''.join(out[:length]) + ''.join(reversed(open_stack))
+        for length, open_stack in reversed(cut_points)
+    ]
+    for candidate in candidates:
+        try:
+            return json.loads(candidate, strict=False)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+def normalize_question(raw: Dict) -> Dict[str, Any]:
+    """Map a JSON question onto the question fields
+
+    Keys are matched case-insensitively (e.g. "correct_answer"), options
+    may be given as a list, a numbered mapping or one string per line and
+    lose numbering only when all of them are numbered in order, and the
+    answer may be a number or the option text.
+    """
+    question: Dict[str, Any] = {}
+    answer = None
+    for key, value in raw.items():
+        field = _field_for_key(key)
+        if field is None or value is None:
+            continue
+        if field == 'CorrectAnswer':
+            answer = value
+        elif field == 'Options':
+            if isinstance(value, dict):
+                value = list(value.values())
+            elif isinstance(value, str):
+                value = [line for line in value.split('\n') if line.strip()]
+            if isinstance(value, list):
+                question['Options'] = _strip_list_numbering([
+                    option.get('text', '') if isinstance(option, dict) else option
+                    for option in value
+                ])
+        else:
+            question[field] = _clean_text(value)
+
+    if answer is not None:
+        # An answer repeating an option's text wins over digits inside that text
+        options = question.get('Options', [])[:4]
+        text = _strip_option_numbering(answer) if isinstance(answer, str) else None
+        number = options.index(text) + 1 if text in options else parse_answer_number(answer)
+        if number is not None:
+            question['CorrectAnswer'] = number
+    return question
+
+def _looks_like_json(text: str) -> bool:
+    return text.lstrip()[:1] in ('{', '[', '`')
+
+def _field_for_key(key: Any) -> Optional[str]:
+    return _KEY_ALIASES.get(re.sub(r'[^a-z]', '', str(key).lower()))
+
+def _parse_json_question(text: str) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Parse the question of a JSON response, possibly cut off mid-stream
+
+    Returns:
+        tuple: The question and the field written last in the response,
+            which may still be growing, or None when the question is closed
+    """
+    value = repair_json(text)
+    last_item = True
+    if isinstance(value, list):
+        dicts = [item for item in value if isinstance(item, dict)]
+        last_item = len(dicts) == 1 and value[-1] is dicts[0]
+        value = dicts[0] if dicts else None
+    if not isinstance(value, dict):
+        return {}, None
+    # normalize_question reorders the fields, so the last one written is
+    # taken from the response's own key order
+    last_field = _field_for_key(next(reversed(value))) if value and last_item else None
+    return normalize_question(value), last_field
+
+def parse_question(response: str) -> Dict[str, Any]:
+    """Parse a generated question in either the JSON or the sectioned text format"""
+    parser = IncrementalQuestionParser()
+    parser.feed(response)
+    return parser.finish()
+
+class IncrementalQuestionParser:
+    def __init__(self, on_section: Optional[Callable[[str, Any], None]] = None):
+        """Parse a generated question from text that arrives in pieces
+
+        Accepts the sectioned text format, line by line as it is fed, and
+        the JSON format, which is re-parsed with repair_json whenever a
+        member of the question object ends. A section is complete once the
+        next section starts, or when finish() is called, and on_section is
+        then called with (field name, value).
+        Options are a list of option texts, CorrectAnswer the 1-based
+        number of the correct option, every other section a string.
+        """
+        self.on_section = on_section
+        self.question: Dict[str, Any] = {}
+        self._buffer = ''
+        self._current_key: Optional[str] = None
+        self._current_value: List[str] = []
+        self._json_mode: Optional[bool] = None
+        self._text = ''
+        # JSON scanner state, so every chunk is scanned once for the end of
+        # a question member instead of re-parsing the whole text each time
+        self._depth = 0
+        self._in_string = self._escaped = self._curly = False
+
+    def feed(self, text: str):
+        """Consume the next piece of the response"""
+        self._text += text
+        if self._json_mode is None and self._text.strip():
+            self._json_mode = _looks_like_json(self._text)
+        if self._json_mode:
+            if self.on_section and self._scan_json(text):
+                self._emit_json(final=False)
+            return
+
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split('\n')
+        for line in lines:
+            self._feed_line(line)
+
+    def finish(self) -> Dict[str, Any]:
+        """Flush the last section and return the parsed question"""
+        if self._json_mode:
+            self._emit_json(final=True)
+            if self.question:
+                return self.question
+            # Not a JSON question after all, read it as sectioned text
+            self._json_mode = False
+            for line in self._text.split('\n'):
+                self._feed_line(line)
+        elif self._buffer:
+            self._feed_line(self._buffer)
+            self._buffer = ''
+        self._complete_section()
+        if not self.question and '{' in self._text:
+            # JSON after some introductory prose
+            self._emit_json(final=True)
+        return self.question
+
+    def _scan_json(self, text: str) -> bool:
+        """Scan new JSON text, True if a member of the question object ended in it
+
+        Follows strings the way repair_json does. The question object is
+        the outermost container, or an object inside an outermost array.
+        """
+        boundary = False
+        for char in text:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"' or (self._curly and char == '”'):
+                    self._in_string = False
+            elif char in '"“”':
+                self._in_string = True
+                self._curly = char != '"'
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                boundary = boundary or self._depth <= 1
+            elif char == ',':
+                boundary = boundary or self._depth <= 2
+        return boundary
+
+    def _emit_json(self, final: bool):
+        question, growing = _parse_json_question(self._text)
+        for key, field_value in question.items():
+            # The field written last may still be growing until the response is complete
+            if key in self.question or (key == growing and not final):
+                continue
+            self.question[key] = field_value
+            if self.on_section:
+                self.on_section(key, field_value)
+
+    def _complete_section(self):
+        if not self._current_key:
+            return
+        key = self._current_key
+        if key == 'Options':
+            value = self._current_value
+        elif key == 'CorrectAnswer':
+            value = parse_answer_number(' '.join(self._current_value))
+        else:
+            value = _clean_text(' '.join(self._current_value))
+        self._current_key = None
+        self._current_value = []
+        if value is None:
+            return
+        self.question[key] = value
+        if self.on_section:
+            self.on_section(key, value)
+
+    def _feed_line(self, line: str):
+        line = line.strip()
+        if not line:
+            return
+
+        match = _HEADER_RE.match(line)
+        if match:
+            self._complete_section()
+            header = re.sub(r'\s+', ' ', match.group(1)).lower()
+            self._current_key = next(
+                key for name, key in SECTION_HEADERS.items() if name.lower() == header
+            )
+            rest = match.group(2).strip()
+            if self._current_key == 'Options':
+                self._current_value = []
+                if rest:
+                    self._feed_line(rest)
+            else:
+                self._current_value = [rest] if rest else []
+            return
+
+        if self._current_key == 'Options':
+            text = _strip_option_numbering(line)
+            if text:
+                self._current_value.append(text)
+        elif self._current_key:
+            self._current_value.append(line)
@@ -0,0 +1,66 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class QuestionPayloadStore:
+    def __init__(self, path: str):
+        """Initialize the side store holding full question bodies
+
+        Vector stores keep only ids and filterable fields in their metadata,
+        full questions live here keyed by vector id and are loaded only for
+        the hits a caller actually uses.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS payloads (
+                id TEXT PRIMARY KEY,
+                section INTEGER NOT NULL,
+                payload TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_payloads_section ON payloads(section)")
+        self._conn.commit()
+
+    def put_many(self, section_num: int, items: List[Tuple[str, Dict]]):
+        """Store (vector id, question) pairs for a section"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO payloads (id, section, payload) VALUES (?, ?, ?)",
+                [(id_, section_num, json.dumps(question, ensure_ascii=False)) for id_, question in items]
+            )
+            self._conn.commit()
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, Dict]:
+        """Load the questions stored under the given vector ids"""
+        ids = list(ids)
+        found = {}
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT id, payload FROM payloads WHERE id IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                found.update((id_, json.loads(payload)) for id_, payload in rows)
+        return found
+
+    def get(self, id_: str) -> Optional[Dict]:
+        """Load a single question by vector id"""
+        return self.get_many([id_]).get(id_)
+
+    def delete_section(self, section_num: int):
+        """Remove every question stored for a section"""
+        with self._lock:
+            self._conn.execute("DELETE FROM payloads WHERE section = ?", (section_num,))
+            self._conn.commit()
@@ -0,0 +1,143 @@
+"""
+Single-file snapshots of the question vector store.
+
+Usage (from the listening-comp directory):
+    python -m backend.snapshot export backend/data/questions.snapshot
+    python -m backend.snapshot import backend/data/questions.snapshot
+"""
+import argparse
+import json
+import os
+import struct
+import numpy as np
+from typing import Dict, Iterable, List, Tuple
+
+SNAPSHOT_MAGIC = b"LCQSNAP\0"
+SNAPSHOT_VERSION = 1
+
+# Vector blocks start on 64 byte boundaries so they can be memory-mapped directly
+_ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sQ")
+
+def _padding(size: int) -> int:
+    return -size % _ALIGNMENT
+
+def write_snapshot(
+    path: str,
+    info: Dict,
+    dimension: int,
+    sections: Dict[int, Tuple[List[Dict], Iterable[np.ndarray]]]
+):
+    """Write a single-file snapshot of question vectors
+
+    Layout: magic and header length, a JSON header, then per section an
+    aligned float32 vector block followed by its JSON records. Offsets in
+    the header are relative to the end of the header padding.
+
+    Args:
+        path: Destination file, replaced atomically
+        info: Free-form fields stored in the header (e.g. embedding backend)
+        dimension: Vector dimension
+        sections: section number -> (records, float32 vector batches), with
+            one record per vector in the same order
+    """
+    encoded = {}
+    layout = {}
+    offset = 0
+    for section_num, (records, _) in sections.items():
+        encoded[section_num] = json.dumps(records, ensure_ascii=False).encode('utf-8')
+        vectors_length = len(records) * dimension * 4
+        layout[str(section_num)] = {
+            "count": len(records),
+            "vectors_offset": offset,
+            "records_offset": offset + vectors_length + _padding(vectors_length),
+            "records_length": len(encoded[section_num])
+        }
+        offset = layout[str(section_num)]["records_offset"] + len(encoded[section_num])
+        offset += _padding(offset)
+
+    header = json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "dimension": dimension,
+        "info": info,
+        "sections": layout
+    }).encode('utf-8')
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREFIX.pack(SNAPSHOT_MAGIC, len(header)))
+        f.write(header)
+        f.write(b"\0" * _padding(_PREFIX.size + len(header)))
+        data_start = f.tell()
+
+        for section_num, (records, batches) in sections.items():
+            entry = layout[str(section_num)]
+            written = 0
+            for batch in batches:
+                batch = np.ascontiguousarray(batch, dtype=np.float32)
+                if batch.ndim != 2 or batch.shape[1] != dimension:
+                    raise ValueError(f"Expected vectors of dimension {dimension}, got shape {batch.shape}")
+                f.write(batch.tobytes())
+                written += batch.shape[0]
+            if written != entry["count"]:
+                raise ValueError(f"Section {section_num} has {entry['count']} records but {written} vectors")
+
+            f.seek(data_start + entry["records_offset"])
+            f.write(encoded[section_num])
+            f.write(b"\0" * _padding(f.tell() - data_start))
+    os.replace(tmp_path, path)
+
+def read_snapshot(path: str) -> Tuple[Dict, Dict[int, Tuple[np.ndarray, List[Dict]]]]:
+    """Open a snapshot, memory-mapping the vectors of each section
+
+    Returns:
+        tuple: The header and section number -> (vectors, records)
+    """
+    with open(path, 'rb') as f:
+        magic, header_length = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a question vector snapshot")
+        header = json.loads(f.read(header_length).decode('utf-8'))
+        if header.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {header.get('version')} in {path}")
+        data_start = _PREFIX.size + header_length
+        data_start += _padding(data_start)
+
+        sections = {}
+        dimension = header['dimension']
+        for section_num, entry in header['sections'].items():
+            if entry['count']:
+                vectors = np.memmap(
+                    path, dtype=np.float32, mode='r',
+                    offset=data_start + entry['vectors_offset'],
+                    shape=(entry['count'], dimension)
+                )
+            else:
+                vectors = np.empty((0, dimension), dtype=np.float32)
+            f.seek(data_start + entry['records_offset'])
+            records = json.loads(f.read(entry['records_length']).decode('utf-8'))
+            sections[int(section_num)] = (vectors, records)
+    return header, sections
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('action', choices=['export', 'import'])
+    parser.add_argument('path', help="Snapshot file")
+    parser.add_argument('--backend', default=None, help="Vector store backend (chroma or numpy)")
+    args = parser.parse_args()
+
+    # Imported here, vector_store itself depends on this module
+    from backend.vector_store import get_vector_store
+    vector_store = get_vector_store(args.backend)
+    if args.action == 'export':
+        counts = vector_store.export_snapshot(args.path)
+        print(f"Exported {sum(counts.values())} questions to {args.path}: {counts}")
+    else:
+        counts = vector_store.import_snapshot(args.path)
+        print(f"Imported {sum(counts.values())} questions from {args.path}: {counts}")
+
+if __name__ == "__main__":
+    main()
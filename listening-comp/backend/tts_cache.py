@@ -0,0 +1,59 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+from backend.disk_cache import DiskCache
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "tts_cache.sqlite3")
+
+class TTSSegmentCache:
+    def __init__(self, path: str, max_bytes: int = 200 * 1024 * 1024):
+        """Initialize an on-disk cache of synthesized speech segments
+
+        Segments are content addressed by text and synthesis settings, so
+        recurring lines such as the announcer's instructions are synthesized
+        once. Least recently used segments are evicted beyond max_bytes.
+        """
+        self.store = DiskCache(path, max_bytes=max_bytes)
+        self.synthesized = 0
+
+    @staticmethod
+    def make_key(text: str, voice_name: str, language_code: str, speaking_rate: float, encoding: str) -> str:
+        """Build the cache key for a segment"""
+        settings = json.dumps([text, voice_name, language_code, speaking_rate, encoding], ensure_ascii=False)
+        return hashlib.sha256(settings.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached audio bytes, or None on a miss"""
+        return self.store.get(key)
+
+    def put(self, key: str, audio: bytes):
+        """Store the audio bytes of a freshly synthesized segment"""
+        self.synthesized += 1
+        self.store.set(key, audio)
+
+    def stats(self) -> Dict:
+        """Report hit/miss counters, synthesis calls and the current cache size"""
+        stats = self.store.stats()
+        stats["synthesized"] = self.synthesized
+        return stats
+
+# Process-wide cache shared by every audio generator
+_tts_cache = None
+_tts_cache_lock = threading.Lock()
+
+def get_tts_cache() -> Optional[TTSSegmentCache]:
+    """Return the shared segment cache, or None when TTS_CACHE_MAX_MB is 0
+
+    The size cap in megabytes comes from the TTS_CACHE_MAX_MB environment
+    variable and defaults to 200.
+    """
+    global _tts_cache
+    max_mb = float(os.environ.get("TTS_CACHE_MAX_MB", 200))
+    if max_mb <= 0:
+        return None
+    with _tts_cache_lock:
+        if _tts_cache is None:
+            _tts_cache = TTSSegmentCache(DEFAULT_CACHE_PATH, max_bytes=int(max_mb * 1024 * 1024))
+        return _tts_cache
@@ -2,19 +2,63 @@ import chromadb
 from chromadb.utils import embedding_functions
 import json
 import os
+import threading
+import time
+from abc import ABC, abstractmethod
 import boto3
-from typing import Dict, List, Optional
+from botocore.exceptions import BotoCoreError, ClientError
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from backend.dedup import MinHashDeduplicator
+from backend.embedding_backfill import EmbeddingBackfillWorker, PendingEmbeddingQueue
+from backend.embedding_cache import EmbeddingCache
+from backend.lexical_index import BM25Index, reciprocal_rank_fusion
+from backend.question_payload_store import QuestionPayloadStore
+from backend.snapshot import read_snapshot, write_snapshot
+
+# Bedrock error codes worth retrying, anything else fails the same way again
+RETRYABLE_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "ModelNotReadyException",
+    "ModelTimeoutException",
+    "RequestTimeout"
+}
 
 class BedrockEmbeddingFunction(embedding_functions.EmbeddingFunction):
-    def __init__(self, model_id="mistral.mixtral-8x7b-instruct-v0:1"):
-        """Initialize Bedrock embedding function"""
+    def __init__(
+        self,
+        model_id="mistral.mixtral-8x7b-instruct-v0:1",
+        max_workers: int = 8,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        cache: Optional[EmbeddingCache] = None
+    ):
+        """Initialize Bedrock embedding function
+
+        Args:
+            model_id: Bedrock embedding model to invoke
+            max_workers: Maximum number of embedding requests in flight at once
+            max_retries: Attempts per text before falling back to a zero
+                vector, only throttling and transient errors are retried
+            backoff_base: Initial retry delay in seconds, doubled on each retry
+            cache: Optional embedding cache consulted before calling Bedrock
+        """
         self.bedrock_client = boto3.client('bedrock-runtime', region_name="us-east-1")
         self.model_id = model_id
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max(1, max_retries)
+        self.backoff_base = backoff_base
+        self.cache = cache
+        # Code of the last non-retryable error, cleared by the next success
+        self.permanent_error: Optional[str] = None
 
-    def __call__(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a list of texts using Bedrock"""
-        embeddings = []
-        for text in texts:
+    def _embed_one(self, text: str) -> Optional[List[float]]:
+        """Embed a single text, retrying throttling and transient errors with exponential backoff"""
+        for attempt in range(self.max_retries):
             try:
                 response = self.bedrock_client.invoke_model(
                     modelId=self.model_id,
@@ -23,145 +67,955 @@ class BedrockEmbeddingFunction(embedding_functions.EmbeddingFunction):
                     })
                 )
                 response_body = json.loads(response['body'].read())
-                embedding = response_body['embedding']
-                embeddings.append(embedding)
+                self.permanent_error = None
+                return response_body['embedding']
+            except ClientError as e:
+                code = e.response.get('Error', {}).get('Code')
+                if code not in RETRYABLE_ERROR_CODES:
+                    # e.g. ValidationException or AccessDeniedException
+                    print(f"Error generating embedding, not retrying: {str(e)}")
+                    self.permanent_error = code
+                    return None
+                print(f"Error generating embedding (attempt {attempt + 1}/{self.max_retries}): {str(e)}")
+            except BotoCoreError as e:
+                # Connection failures and timeouts
+                print(f"Error generating embedding (attempt {attempt + 1}/{self.max_retries}): {str(e)}")
             except Exception as e:
-                print(f"Error generating embedding: {str(e)}")
+                print(f"Error generating embedding, not retrying: {str(e)}")
+                return None
+            if attempt < self.max_retries - 1:
+                time.sleep(self.backoff_base * (2 ** attempt))
+        return None
+
+    def _embed_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Embed texts concurrently, keeping results in input order"""
+        if len(texts) <= 1 or self.max_workers == 1:
+            return [self._embed_one(text) for text in texts]
+
+        # The pool size bounds the number of requests in flight, and map()
+        # yields results in the order the texts were submitted
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(texts))) as executor:
+            return list(executor.map(self._embed_one, texts))
+
+    def _embed_cached(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Embed texts, serving repeated texts from the cache when one is configured"""
+        if self.cache is None:
+            return self._embed_many(texts)
+
+        embeddings = self.cache.get_many(self.model_id, texts)
+        missing = list(dict.fromkeys(
+            text for text, embedding in zip(texts, embeddings) if embedding is None
+        ))
+        if missing:
+            fresh = dict(zip(missing, self._embed_many(missing)))
+            # Only cache real embeddings, never the failure fallback
+            succeeded = [text for text in missing if fresh[text] is not None]
+            self.cache.put_many(self.model_id, succeeded, [fresh[text] for text in succeeded])
+            embeddings = [
+                fresh[text] if embedding is None else embedding
+                for text, embedding in zip(texts, embeddings)
+            ]
+        return embeddings
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for a list of texts using Bedrock"""
+        embeddings = []
+        for embedding in self._embed_cached(list(texts)):
+            if embedding is None:
                 # Return a zero vector as fallback
-                embeddings.append([0.0] * 1536)  # Titan model uses 1536 dimensions
+                embedding = [0.0] * 1536  # Titan model uses 1536 dimensions
+            embeddings.append(embedding)
         return embeddings
 
-class QuestionVectorStore:
-    def __init__(self, persist_directory: str = "backend/data/vectorstore"):
-        """Initialize the vector store for Marathi listening questions"""
+EMBEDDING_BACKENDS = ("bedrock", "local")
+
+def create_embedding_function(backend: str, cache_path: Optional[str] = None):
+    """Create the embedding function for the configured backend
+
+    Args:
+        backend: "bedrock" for Titan embeddings or "local" for the offline
+            hashed n-gram embeddings
+        cache_path: Location of the persistent embedding cache (Bedrock only)
+
+    Bedrock requests in flight are limited by the EMBEDDING_MAX_WORKERS
+    environment variable, default 8.
+    """
+    if backend == "bedrock":
+        cache = EmbeddingCache(cache_path) if cache_path else None
+        return BedrockEmbeddingFunction(
+            max_workers=int(os.environ.get("EMBEDDING_MAX_WORKERS", 8)),
+            cache=cache
+        )
+    if backend == "local":
+        from backend.local_embedding import HashedNgramEmbeddingFunction
+        return HashedNgramEmbeddingFunction(
+            dimension=int(os.environ.get("LOCAL_EMBEDDING_DIM", 1024))
+        )
+    raise ValueError(f"Unknown embedding backend '{backend}', expected one of {EMBEDDING_BACKENDS}")
+
+def build_question_document(section_num: int, question: Dict) -> str:
+    """Create the searchable document text for a question"""
+    if section_num == 2:
+        return f"""
+                Introduction: {question.get('Introduction', '')}
+                Dialogue: {question.get('Conversation', '')}
+                Question: {question.get('Question', '')}
+                """
+    # section 3
+    return f"""
+                Situation: {question.get('Situation', '')}
+                Question: {question.get('Question', '')}
+                """
+
+LEXICAL_FIELDS = ('Introduction', 'Conversation', 'Situation', 'Question')
+
+def build_lexical_text(question: Dict, topic: Optional[str] = None) -> str:
+    """Create the text indexed by the BM25 retriever for a question"""
+    parts = [str(question.get(field, '')) for field in LEXICAL_FIELDS]
+    if topic:
+        parts.append(topic)
+    return '\n'.join(parts)
+
+SECTION_PRACTICE_TYPES = {
+    2: "Dialogue Practice",
+    3: "Phrase Matching"
+}
+
+def build_question_metadata(
+    question_id: str,
+    section_num: int,
+    question_index: int,
+    topic: Optional[str] = None
+) -> Dict:
+    """Create the slim vector metadata for a question
+
+    Only ids and filterable fields go into the vector store, the full
+    question is kept in the QuestionPayloadStore.
+    """
+    metadata = {
+        "question_id": question_id,
+        "section": section_num,
+        "question_index": question_index,
+        "practice_type": SECTION_PRACTICE_TYPES[section_num]
+    }
+    if topic:
+        metadata["topic"] = topic
+    return metadata
+
+def is_zero_vector(embedding) -> bool:
+    """True for the fallback vector returned when embedding fails"""
+    return not any(embedding)
+
+def hydrate_questions(
+    payload_store: QuestionPayloadStore,
+    ids: List[str],
+    metadatas: List[Optional[Dict]]
+) -> Dict[str, Dict]:
+    """Load full questions for the given vector hits
+
+    Entries indexed before payloads moved to the side store still carry
+    their question in the 'full_structure' metadata field.
+    """
+    questions = payload_store.get_many(ids)
+    for id_, metadata in zip(ids, metadatas):
+        if id_ not in questions and metadata and 'full_structure' in metadata:
+            try:
+                questions[id_] = json.loads(metadata['full_structure'])
+            except Exception as e:
+                print(f"Error parsing question data: {str(e)}")
+    return questions
+
+COLLECTION_DESCRIPTIONS = {
+    2: "Marathi listening comprehension questions - Section 2",
+    3: "Marathi phrase matching questions - Section 3"
+}
+
+# ChromaDB clients shared by every store in the process, keyed by path
+_chroma_clients = {}
+_chroma_clients_lock = threading.Lock()
+
+def get_chroma_client(persist_directory: str):
+    """Return the process-wide ChromaDB client for a directory"""
+    path = os.path.abspath(persist_directory)
+    with _chroma_clients_lock:
+        if path not in _chroma_clients:
+            _chroma_clients[path] = chromadb.PersistentClient(path=persist_directory)
+        return _chroma_clients[path]
+
+class BaseQuestionVectorStore(ABC):
+    def __init__(self, persist_directory: str, embedding_backend: Optional[str] = None):
+        """Shared retrieval logic for the question vector stores
+
+        Subclasses provide the dense index through the abstract _count,
+        _list_entries, _add_entries, _update_embeddings, _dense_search,
+        _get_embeddings, _get_metadatas, _existing_ids and _clear hooks.
+
+        Args:
+            persist_directory: Directory holding the vector data
+            embedding_backend: "bedrock" or "local", defaults to the
+                EMBEDDING_BACKEND environment variable
+        """
         self.persist_directory = persist_directory
+        self.embedding_backend = embedding_backend or os.environ.get("EMBEDDING_BACKEND", "bedrock")
+        data_directory = os.path.dirname(persist_directory)
         
-        # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(path=persist_directory)
-        
-        # Use Bedrock's Titan embedding model
-        self.embedding_fn = BedrockEmbeddingFunction()
-        
-        # Create or get collections for each section type
-        self.collections = {
-            "section2": self.client.get_or_create_collection(
-                name="section2_questions",
-                embedding_function=self.embedding_fn,
-                metadata={"description": "Marathi listening comprehension questions - Section 2"}
-            ),
-            "section3": self.client.get_or_create_collection(
-                name="section3_questions",
-                embedding_function=self.embedding_fn,
-                metadata={"description": "Marathi phrase matching questions - Section 3"}
+        # Bedrock embeddings are backed by a persistent cache so repeated
+        # texts (e.g. topic queries) are only embedded once
+        self.embedding_fn = create_embedding_function(
+            self.embedding_backend,
+            cache_path=os.path.join(data_directory, "embedding_cache.sqlite3")
+        )
+        
+        # Full question bodies live in a side store keyed by vector id, one
+        # per store and backend so clearing a section here leaves the other
+        # stores' questions alone
+        self.payload_store = QuestionPayloadStore(
+            os.path.join(
+                data_directory,
+                f"question_payloads_{os.path.basename(os.path.normpath(persist_directory))}"
+                f"_{self.embedding_backend}.sqlite3"
             )
-        }
+        )
+        
+        # BM25 indexes, near-duplicate sketches and topic partitions per
+        # section, built from stored questions on first use
+        self.lexical_indexes = {}
+        self.deduplicators = {}
+        self.topic_members = {}
+        self._derived_lock = threading.RLock()
+        
+        # Per-topic [vector sum, count] of stored embeddings, used to route
+        # queries without an explicit topic to the closest topic partition
+        self.topic_centroids = {}
+        self.topic_routing_threshold = float(os.environ.get("TOPIC_ROUTING_THRESHOLD", 0.2))
+        
+        # Query embeddings computed at startup (e.g. every configured topic),
+        # served from memory without touching the embedding backend
+        self.pinned_embeddings = {}
+        self._pinned_lock = threading.Lock()
+        
+        # Entries at or above this estimated similarity to a stored question
+        # are dropped on insert, set DEDUP_THRESHOLD above 1 to disable
+        self.dedup_threshold = float(os.environ.get("DEDUP_THRESHOLD", 0.85))
+        self.duplicates_dropped = 0
+        
+        # Documents stored with the zero fallback vector because embedding
+        # failed, re-embedded in the background by the backfill worker
+        self.pending_embeddings = PendingEmbeddingQueue(
+            os.path.join(
+                data_directory,
+                f"pending_embeddings_{os.path.basename(os.path.normpath(persist_directory))}"
+                f"_{self.embedding_backend}.sqlite3"
+            )
+        )
+        self.backfill_worker = EmbeddingBackfillWorker(
+            self, self.pending_embeddings,
+            interval=float(os.environ.get("EMBEDDING_BACKFILL_INTERVAL", 30))
+        )
+
+    # Backend hooks
+
+    @abstractmethod
+    def _count(self, section_num: int) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _list_entries(self, section_num: int) -> Tuple[List[str], List[Dict]]:
+        """Return the ids and metadatas of every stored entry"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _add_entries(
+        self,
+        section_num: int,
+        ids: List[str],
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict]
+    ):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _update_embeddings(self, section_num: int, ids: List[str], embeddings: List[List[float]]):
+        """Replace the vectors of stored entries"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _dense_search(
+        self,
+        section_num: int,
+        embedding: List[float],
+        k: int,
+        where: Optional[Dict] = None
+    ) -> List[Tuple[str, float]]:
+        """Return up to k (id, distance) pairs, most similar first
+
+        where restricts the search to entries whose metadata equals every
+        given field.
+        """
+        raise NotImplementedError
 
-    def add_questions(self, section_num: int, questions: List[Dict], question_id: str):
-        """Add questions to the vector store"""
+    @abstractmethod
+    def _get_embeddings(self, section_num: int, ids: List[str]) -> List[Optional[List[float]]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_metadatas(self, section_num: int, ids: List[str]) -> List[Optional[Dict]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _existing_ids(self, section_num: int, ids: List[str]) -> List[str]:
+        """Return which of the given ids are stored"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _clear(self, section_num: int):
+        raise NotImplementedError
+
+    # Shared logic
+
+    @staticmethod
+    def _check_section(section_num: int):
         if section_num not in [2, 3]:
             raise ValueError("Only sections 2 and 3 are currently supported")
-            
-        collection = self.collections[f"section{section_num}"]
+
+    def _load_stored_questions(self, section_num: int) -> List[Tuple[str, Dict, Dict]]:
+        """Return (id, question, metadata) for every stored entry"""
+        ids, metadatas = self._list_entries(section_num)
+        payloads = hydrate_questions(self.payload_store, ids, metadatas)
+        return [
+            (id_, payloads[id_], metadata or {})
+            for id_, metadata in zip(ids, metadatas)
+            if id_ in payloads
+        ]
+
+    def _build_derived_indexes(self, section_num: int):
+        """Build the BM25 index, near-duplicate sketches and topic partitions for a section"""
+        lexical_index = BM25Index()
+        deduplicator = MinHashDeduplicator(threshold=self.dedup_threshold)
+        topic_members = {}
+        for id_, question, metadata in self._load_stored_questions(section_num):
+            lexical_index.add(id_, build_lexical_text(question, metadata.get('topic')))
+            deduplicator.add(id_, deduplicator.signature(build_lexical_text(question)))
+            if metadata.get('topic'):
+                topic_members.setdefault(metadata['topic'], set()).add(id_)
+        self.lexical_indexes[section_num] = lexical_index
+        self.deduplicators[section_num] = deduplicator
+        self.topic_members[section_num] = topic_members
+
+    def _get_lexical_index(self, section_num: int) -> BM25Index:
+        with self._derived_lock:
+            if section_num not in self.lexical_indexes:
+                self._build_derived_indexes(section_num)
+            return self.lexical_indexes[section_num]
+
+    def _get_deduplicator(self, section_num: int) -> MinHashDeduplicator:
+        with self._derived_lock:
+            if section_num not in self.deduplicators:
+                self._build_derived_indexes(section_num)
+            return self.deduplicators[section_num]
+
+    def _get_topic_members(self, section_num: int) -> Dict[str, set]:
+        with self._derived_lock:
+            if section_num not in self.topic_members:
+                self._build_derived_indexes(section_num)
+            return self.topic_members[section_num]
+
+    def _accumulate_centroids(self, centroids: Dict, topics: List[str], embeddings) -> None:
+        for topic, embedding in zip(topics, embeddings):
+            if not topic or embedding is None or is_zero_vector(embedding):
+                continue
+            vector = np.asarray(embedding, dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            entry = centroids.setdefault(topic, [np.zeros_like(vector), 0])
+            entry[0] += vector / norm
+            entry[1] += 1
+
+    def _get_topic_centroids(self, section_num: int) -> Dict[str, list]:
+        """Per-topic [vector sum, count] of stored embeddings, computed on first use"""
+        with self._derived_lock:
+            if section_num not in self.topic_centroids:
+                centroids = {}
+                for topic, members in self._get_topic_members(section_num).items():
+                    members = list(members)
+                    self._accumulate_centroids(
+                        centroids, [topic] * len(members), self._get_embeddings(section_num, members)
+                    )
+                self.topic_centroids[section_num] = centroids
+            return self.topic_centroids[section_num]
+
+    def route_topic(self, section_num: int, embedding: List[float]) -> Optional[str]:
+        """Return the topic whose centroid is closest to an embedding
+
+        None when no centroid reaches the routing threshold.
+        """
+        # Inserts add topics and update the sums in place, so read a copy
+        with self._derived_lock:
+            centroids = [
+                (topic, total.copy()) for topic, (total, _) in self._get_topic_centroids(section_num).items()
+            ]
+        if not centroids or is_zero_vector(embedding):
+            return None
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / np.linalg.norm(query)
+        best_topic, best_similarity = None, self.topic_routing_threshold
+        for topic, total in centroids:
+            norm = np.linalg.norm(total)
+            if norm == 0 or total.shape != query.shape:
+                continue
+            similarity = float(total @ query / norm)
+            if similarity >= best_similarity:
+                best_topic, best_similarity = topic, similarity
+        return best_topic
+
+    def _add_items(
+        self,
+        section_num: int,
+        items: List[Tuple[str, int, Dict, Optional[str]]]
+    ) -> int:
+        """Index (question_id, question_index, question, topic) items in one batch
+
+        Items whose id is already indexed are skipped. Items that are
+        near-duplicates of a stored question (or of an earlier item in the
+        batch) are dropped.
+
+        Returns:
+            int: Number of items dropped as near-duplicates
+        """
+        self._check_section(section_num)
+        
+        unique_ids = [f"{question_id}_{section_num}_{idx}" for question_id, idx, _, _ in items]
+        already_indexed = self.get_indexed_ids(section_num, unique_ids)
         
         ids = []
         documents = []
         metadatas = []
+        kept = []
+        dropped = 0
         
-        for idx, question in enumerate(questions):
-            # Create a unique ID for each question
-            unique_id = f"{question_id}_{section_num}_{idx}"
-            ids.append(unique_id)
+        # Hold the lock while checking for duplicates, so concurrent inserts
+        # of the same question cannot both slip through
+        with self._derived_lock:
+            deduplicator = self._get_deduplicator(section_num)
             
-            # Store the full question structure as metadata
-            metadatas.append({
-                "question_id": question_id,
-                "section": section_num,
-                "question_index": idx,
-                "full_structure": json.dumps(question, ensure_ascii=False)
-            })
+            for unique_id, (question_id, idx, question, topic) in zip(unique_ids, items):
+                if unique_id in already_indexed:
+                    continue
+                
+                signature = deduplicator.signature(build_lexical_text(question))
+                duplicate = deduplicator.find_duplicate(signature, exclude=unique_id)
+                if duplicate:
+                    print(f"Dropping {unique_id} as a near-duplicate of {duplicate[0]} "
+                          f"(similarity {duplicate[1]:.2f})")
+                    dropped += 1
+                    continue
+                # Later questions in the batch are checked against this one too
+                deduplicator.add(unique_id, signature)
+                
+                ids.append(unique_id)
+                kept.append((question, topic))
+                
+                # Keep only ids and filterable fields as metadata
+                metadatas.append(build_question_metadata(question_id, section_num, idx, topic))
+                
+                # Create a searchable document from the question content
+                documents.append(build_question_document(section_num, question))
             
-            # Create a searchable document from the question content
-            if section_num == 2:
-                document = f"""
-                Introduction: {question.get('Introduction', '')}
-                Dialogue: {question.get('Conversation', '')}
-                Question: {question.get('Question', '')}
-                """
-            else:  # section 3
-                document = f"""
-                Situation: {question.get('Situation', '')}
-                Question: {question.get('Question', '')}
-                """
-            documents.append(document)
+            self.duplicates_dropped += dropped
         
-        # Add to collection
-        collection.add(
-            ids=ids,
-            documents=documents,
-            metadatas=metadatas
-        )
+        if dropped:
+            print(f"Dropped {dropped} near-duplicate question(s) from section {section_num}")
+        if not kept:
+            return dropped
+        
+        try:
+            # Store the full question structures before they become searchable
+            self.payload_store.put_many(section_num, [
+                (unique_id, question) for unique_id, (question, _) in zip(ids, kept)
+            ])
+            
+            # Embed the whole batch at once, outside the lock so searches are not
+            # held up by the network calls
+            embeddings = self.embedding_fn(documents)
+            self._add_entries(section_num, ids, documents, embeddings, metadatas)
+        except Exception:
+            # Nothing was indexed, so a retry must not match these questions
+            with self._derived_lock:
+                for unique_id in ids:
+                    deduplicator.remove(unique_id)
+            raise
+        topics = [topic for _, topic in kept]
+        
+        degraded = [
+            (unique_id, document)
+            for unique_id, document, embedding in zip(ids, documents, embeddings)
+            if is_zero_vector(embedding)
+        ]
+        if degraded:
+            print(f"Queued {len(degraded)} question(s) in section {section_num} for re-embedding")
+            self.pending_embeddings.add_many(section_num, degraded)
+        
+        with self._derived_lock:
+            lexical_index = self._get_lexical_index(section_num)
+            topic_members = self._get_topic_members(section_num)
+            for unique_id, (question, topic) in zip(ids, kept):
+                lexical_index.add(unique_id, build_lexical_text(question, topic))
+                if topic:
+                    topic_members.setdefault(topic, set()).add(unique_id)
+            if section_num in self.topic_centroids:
+                self._accumulate_centroids(self.topic_centroids[section_num], topics, embeddings)
+        
+        return dropped
+
+    def add_questions(
+        self,
+        section_num: int,
+        questions: List[Dict],
+        question_id: str,
+        topic: Optional[str] = None
+    ) -> int:
+        """Add questions to the vector store
+
+        Returns:
+            int: Number of questions dropped as near-duplicates
+        """
+        return self._add_items(section_num, [
+            (question_id, idx, question, topic) for idx, question in enumerate(questions)
+        ])
+
+    def add_records(self, section_num: int, records: List[Tuple[str, Dict, Optional[str]]]) -> int:
+        """Add (question_id, question, topic) records, embedding them as one batch
+
+        Each record is indexed the way add_question would index it.
+
+        Returns:
+            int: Number of records dropped as near-duplicates
+        """
+        return self._add_items(section_num, [
+            (question_id, 0, question, topic) for question_id, question, topic in records
+        ])
+
+    def replace_embeddings(self, section_num: int, ids: List[str], embeddings: List[List[float]]):
+        """Store real embeddings for entries that were indexed with the fallback vector"""
+        self._check_section(section_num)
+        self._update_embeddings(section_num, ids, embeddings)
+        with self._derived_lock:
+            if section_num in self.topic_centroids:
+                metadatas = self._get_metadatas(section_num, ids)
+                self._accumulate_centroids(
+                    self.topic_centroids[section_num],
+                    [(metadata or {}).get('topic') for metadata in metadatas],
+                    embeddings
+                )
+
+    def get_indexed_ids(self, section_num: int, ids: List[str]) -> set:
+        """Return the subset of vector ids that are already indexed"""
+        self._check_section(section_num)
+        if not ids:
+            return set()
+        return set(self._existing_ids(section_num, ids))
+
+    def add_question(
+        self,
+        section_num: int,
+        question: Dict,
+        question_id: str,
+        topic: Optional[str] = None
+    ) -> int:
+        """Add a single question to the vector store"""
+        return self.add_questions(section_num, [question], question_id, topic)
+
+    def _load_payloads(self, section_num: int, ids: List[str]) -> Dict[str, Dict]:
+        """Load full questions for hits, falling back to legacy metadata"""
+        payloads = self.payload_store.get_many(ids)
+        missing = [id_ for id_ in ids if id_ not in payloads]
+        if missing:
+            payloads.update(hydrate_questions(
+                self.payload_store, missing, self._get_metadatas(section_num, missing)
+            ))
+        return payloads
+
+    def warm_up(self, texts: List[str]) -> int:
+        """Embed query texts in one batch and pin their vectors in memory
+
+        Texts that are already pinned are skipped, and failed embeddings are
+        not pinned so a later query retries them.
+
+        Returns:
+            int: Number of texts newly pinned
+        """
+        with self._pinned_lock:
+            missing = [text for text in dict.fromkeys(texts) if text not in self.pinned_embeddings]
+        if not missing:
+            return 0
+        
+        pinned = 0
+        embeddings = self.embedding_fn(missing)
+        with self._pinned_lock:
+            for text, embedding in zip(missing, embeddings):
+                if not is_zero_vector(embedding):
+                    self.pinned_embeddings[text] = embedding
+                    pinned += 1
+        return pinned
+
+    def _embed_query(self, query: str) -> List[float]:
+        """Embed a query, serving pinned texts from memory"""
+        embedding = self.pinned_embeddings.get(query)
+        if embedding is None:
+            embedding = self.embedding_fn([query])[0]
+        return embedding
+
+    def _rank_candidates(
+        self,
+        section_num: int,
+        query: str,
+        query_embedding: Optional[List[float]],
+        pool_size: int,
+        topic: Optional[str] = None
+    ) -> Tuple[List[str], Dict[str, float]]:
+        """Fuse dense and BM25 rankings, optionally within one topic partition
+
+        Returns:
+            tuple: Fused ids and the dense distance of each dense hit
+        """
+        members = self._get_topic_members(section_num).get(topic) if topic else None
+        
+        distances = {}
+        vector_ids = []
+        if query_embedding is not None:
+            where = {"topic": topic} if topic else None
+            hits = self._dense_search(section_num, query_embedding, pool_size, where)
+            vector_ids = [id_ for id_, _ in hits]
+            distances = dict(hits)
+        
+        # Inserts update the BM25 postings and topic members under the same lock
+        with self._derived_lock:
+            lexical_ids = [
+                id_ for id_, _ in self._get_lexical_index(section_num).search(query, pool_size, allowed=members)
+            ]
+        return reciprocal_rank_fusion([vector_ids, lexical_ids]), distances
 
     def search_similar_questions(
         self, 
         section_num: int, 
         query: str, 
-        n_results: int = 5
+        n_results: int = 5,
+        topic: Optional[str] = None
     ) -> List[Dict]:
-        """Search for similar questions in the vector store"""
-        if section_num not in [2, 3]:
-            raise ValueError("Only sections 2 and 3 are currently supported")
-            
-        collection = self.collections[f"section{section_num}"]
+        """Search for similar questions in the vector store
+
+        Dense and BM25 rankings are fused with reciprocal rank fusion. When
+        the query cannot be embedded, only the lexical ranking is used.
+
+        The query is answered from its topic's partition first: the given
+        topic, or the topic whose centroid is closest to the query. The whole
+        section is searched only when the partition returns too few hits.
+        """
+        self._check_section(section_num)
         
         # If collection is empty, return empty list
-        if collection.count() == 0:
+        count = self._count(section_num)
+        if count == 0:
             return []
-            
-        results = collection.query(
-            query_texts=[query],
-            n_results=min(n_results, collection.count())
-        )
+        
+        query_embedding = self._embed_query(query)
+        if is_zero_vector(query_embedding):
+            query_embedding = None
+        elif topic is None:
+            topic = self.route_topic(section_num, query_embedding)
+        
+        ids = []
+        distances = {}
+        members = self._get_topic_members(section_num).get(topic) if topic else None
+        if members:
+            # Rank a wider candidate pool from each retriever before fusing
+            pool_size = min(max(n_results * 4, 20), len(members))
+            ids, distances = self._rank_candidates(section_num, query, query_embedding, pool_size, topic)
+            ids = ids[:n_results]
+        
+        if len(ids) < n_results:
+            pool_size = min(max(n_results * 4, 20), count)
+            global_ids, global_distances = self._rank_candidates(section_num, query, query_embedding, pool_size)
+            seen = set(ids)
+            ids += [id_ for id_ in global_ids if id_ not in seen][:n_results - len(ids)]
+            distances = {**global_distances, **distances}
+        
+        if not ids:
+            return []
+        
+        # Load full questions only for the hits that are returned
+        payloads = self._load_payloads(section_num, ids)
         
         # Convert results to more usable format
         questions = []
-        for idx, metadata in enumerate(results.get('metadatas', [[]])[0]):
-            if not metadata:
+        for id_ in ids:
+            if id_ not in payloads:
                 continue
-                
-            try:
-                question_data = json.loads(metadata['full_structure'])
-                if results.get('distances') and len(results['distances']) > 0:
-                    question_data['similarity_score'] = results['distances'][0][idx]
-                questions.append(question_data)
-            except Exception as e:
-                print(f"Error parsing question data: {str(e)}")
+            question_data = dict(payloads[id_])
+            if id_ in distances:
+                question_data['similarity_score'] = distances[id_]
+            questions.append(question_data)
             
         return questions
 
+    def degraded_count(self, section_num: Optional[int] = None) -> int:
+        """Number of stored questions still waiting for a real embedding"""
+        return self.pending_embeddings.count(section_num)
+
+    def start_embedding_backfill(self):
+        """Start re-embedding degraded questions in the background"""
+        self.backfill_worker.start()
+
     def get_question_by_id(self, section_num: int, question_id: str) -> Optional[Dict]:
         """Retrieve a specific question by its ID"""
-        if section_num not in [2, 3]:
-            raise ValueError("Only sections 2 and 3 are currently supported")
-            
-        collection = self.collections[f"section{section_num}"]
-        
-        result = collection.get(
-            ids=[question_id],
-            include=['metadatas']
+        self._check_section(section_num)
+        return self._load_payloads(section_num, [question_id]).get(question_id)
+
+    def _reset_derived_indexes(self, section_num: int):
+        """Drop the in-memory indexes of a section so they are rebuilt on next use"""
+        with self._derived_lock:
+            self.lexical_indexes.pop(section_num, None)
+            self.deduplicators.pop(section_num, None)
+            self.topic_members.pop(section_num, None)
+            self.topic_centroids.pop(section_num, None)
+
+    def export_snapshot(self, path: str, batch_size: int = 1024) -> Dict[int, int]:
+        """Write ids, vectors, metadata and questions of every section to one file
+
+        Vectors are written as raw float32 blocks that import_snapshot
+        memory-maps, so a new instance can load them without re-embedding.
+
+        Returns:
+            dict: Number of entries exported per section
+        """
+        sections = {}
+        dimension = 0
+        for section_num in SECTION_PRACTICE_TYPES:
+            ids, metadatas = self._list_entries(section_num)
+            payloads = self._load_payloads(section_num, ids) if ids else {}
+            records = [
+                {
+                    "id": id_,
+                    # Legacy entries carry the full question in their metadata,
+                    # it is exported once as the question instead
+                    "metadata": {k: v for k, v in (metadata or {}).items() if k != 'full_structure'},
+                    "question": payloads.get(id_)
+                }
+                for id_, metadata in zip(ids, metadatas)
+            ]
+            sections[section_num] = records
+            if ids and not dimension:
+                dimension = len(self._get_embeddings(section_num, ids[:1])[0])
+
+        def vector_batches(section_num, records):
+            for start in range(0, len(records), batch_size):
+                chunk = [record["id"] for record in records[start:start + batch_size]]
+                embeddings = self._get_embeddings(section_num, chunk)
+                yield np.asarray([
+                    np.zeros(dimension) if embedding is None else embedding
+                    for embedding in embeddings
+                ], dtype=np.float32).reshape(len(chunk), dimension)
+
+        write_snapshot(
+            path,
+            {
+                "embedding_backend": self.embedding_backend,
+                "model_id": getattr(self.embedding_fn, 'model_id', None)
+            },
+            dimension,
+            {
+                section_num: (records, vector_batches(section_num, records))
+                for section_num, records in sections.items()
+            }
         )
+        return {section_num: len(records) for section_num, records in sections.items()}
+
+    def import_snapshot(self, path: str, batch_size: int = 1024) -> Dict[int, int]:
+        """Load a snapshot written by export_snapshot, skipping ids already indexed
+
+        The snapshot must come from the same embedding backend. Entries are
+        added as they are, without near-duplicate checks or re-embedding;
+        entries that still carry the fallback vector are queued for backfill.
+
+        Returns:
+            dict: Number of entries imported per section
+        """
+        header, sections = read_snapshot(path)
+        backend = header.get('info', {}).get('embedding_backend')
+        if backend != self.embedding_backend:
+            raise ValueError(
+                f"Snapshot was built with the '{backend}' embedding backend, "
+                f"this store uses '{self.embedding_backend}'"
+            )
         
-        if result['metadatas']:
-            return json.loads(result['metadatas'][0]['full_structure'])
-        return None
-        
-    def add_question(self, section_num: int, question: Dict, question_id: str):
-        """Add a single question to the vector store"""
-        self.add_questions(section_num, [question], question_id)
-        
+        imported = {}
+        for section_num, (vectors, records) in sections.items():
+            self._check_section(section_num)
+            added = 0
+            for start in range(0, len(records), batch_size):
+                chunk = records[start:start + batch_size]
+                already_indexed = self.get_indexed_ids(section_num, [record["id"] for record in chunk])
+                rows = [
+                    (start + offset, record) for offset, record in enumerate(chunk)
+                    if record["id"] not in already_indexed
+                ]
+                if not rows:
+                    continue
+                
+                ids = [record["id"] for _, record in rows]
+                embeddings = np.asarray(vectors[[row for row, _ in rows]])
+                documents = [build_question_document(section_num, record["question"] or {}) for _, record in rows]
+                
+                self.payload_store.put_many(section_num, [
+                    (record["id"], record["question"]) for _, record in rows if record["question"]
+                ])
+                self._add_entries(section_num, ids, documents, embeddings, [record["metadata"] for _, record in rows])
+                
+                degraded = [
+                    (id_, document)
+                    for id_, document, embedding in zip(ids, documents, embeddings)
+                    if is_zero_vector(embedding)
+                ]
+                if degraded:
+                    self.pending_embeddings.add_many(section_num, degraded)
+                added += len(rows)
+            
+            self._reset_derived_indexes(section_num)
+            imported[section_num] = added
+        return imported
+
     def clear_collection(self, section_num: int):
         """Clear all questions from a collection"""
-        if section_num not in [2, 3]:
-            raise ValueError("Only sections 2 and 3 are currently supported")
-            
-        collection = self.collections[f"section{section_num}"]
-        collection.delete(where={})
\ No newline at end of file
+        self._check_section(section_num)
+        with self._derived_lock:
+            self._clear(section_num)
+            self.payload_store.delete_section(section_num)
+            self.pending_embeddings.delete_section(section_num)
+            self._reset_derived_indexes(section_num)
+
+class QuestionVectorStore(BaseQuestionVectorStore):
+    def __init__(
+        self,
+        persist_directory: str = "backend/data/vectorstore",
+        embedding_backend: Optional[str] = None
+    ):
+        """Initialize the vector store for Marathi listening questions
+
+        Collections are opened lazily on first use.
+
+        Args:
+            persist_directory: Directory holding the ChromaDB data
+            embedding_backend: "bedrock" or "local", defaults to the
+                EMBEDDING_BACKEND environment variable
+        """
+        super().__init__(persist_directory, embedding_backend)
+        
+        # Initialize ChromaDB client
+        self.client = get_chroma_client(persist_directory)
+        
+        # Embedding dimensions differ between backends, so each backend
+        # other than the original Bedrock one gets its own collections
+        self.collection_suffix = "" if self.embedding_backend == "bedrock" else f"_{self.embedding_backend}"
+        self.collections = {}
+        self._collections_lock = threading.Lock()
+
+    def _get_collection(self, section_num: int):
+        """Get or create the collection for a section type"""
+        self._check_section(section_num)
+
+        key = f"section{section_num}"
+        with self._collections_lock:
+            if key not in self.collections:
+                self.collections[key] = self.client.get_or_create_collection(
+                    name=f"section{section_num}_questions{self.collection_suffix}",
+                    embedding_function=self.embedding_fn,
+                    metadata={"description": COLLECTION_DESCRIPTIONS[section_num]}
+                )
+            return self.collections[key]
+
+    def _count(self, section_num: int) -> int:
+        return self._get_collection(section_num).count()
+
+    def _list_entries(self, section_num: int) -> Tuple[List[str], List[Dict]]:
+        stored = self._get_collection(section_num).get(include=['metadatas'])
+        return stored['ids'], stored['metadatas']
+
+    def _add_entries(self, section_num, ids, documents, embeddings, metadatas):
+        self._get_collection(section_num).add(
+            ids=ids,
+            documents=documents,
+            embeddings=embeddings,
+            metadatas=metadatas
+        )
+
+    def _update_embeddings(self, section_num: int, ids: List[str], embeddings: List[List[float]]):
+        self._get_collection(section_num).update(ids=ids, embeddings=embeddings)
+
+    def _dense_search(self, section_num, embedding, k, where=None) -> List[Tuple[str, float]]:
+        results = self._get_collection(section_num).query(
+            query_embeddings=[embedding],
+            n_results=k,
+            where=where,
+            include=['distances']
+        )
+        return list(zip(results['ids'][0], (results.get('distances') or [[]])[0]))
+
+    def _get_embeddings(self, section_num: int, ids: List[str]) -> List[Optional[List[float]]]:
+        if not ids:
+            return []
+        result = self._get_collection(section_num).get(ids=ids, include=['embeddings'])
+        by_id = dict(zip(result['ids'], result['embeddings']))
+        return [by_id.get(id_) for id_ in ids]
+
+    def _get_metadatas(self, section_num: int, ids: List[str]) -> List[Optional[Dict]]:
+        result = self._get_collection(section_num).get(ids=ids, include=['metadatas'])
+        by_id = dict(zip(result['ids'], result['metadatas']))
+        return [by_id.get(id_) for id_ in ids]
+
+    def _existing_ids(self, section_num: int, ids: List[str]) -> List[str]:
+        return self._get_collection(section_num).get(ids=ids, include=[])['ids']
+
+    def _clear(self, section_num: int):
+        collection = self._get_collection(section_num)
+        ids = collection.get(include=[])['ids']
+        if ids:
+            collection.delete(ids=ids)
+
+VECTOR_STORE_BACKENDS = ("chroma", "numpy")
+
+def create_question_vector_store(backend: Optional[str] = None):
+    """Create the question vector store for the configured backend
+
+    Args:
+        backend: "chroma" (default) or "numpy" for the in-process index,
+            defaults to the VECTOR_STORE_BACKEND environment variable
+    """
+    backend = backend or os.environ.get("VECTOR_STORE_BACKEND", "chroma")
+    if backend == "chroma":
+        return QuestionVectorStore()
+    if backend == "numpy":
+        from backend.numpy_store import NumpyQuestionVectorStore
+        return NumpyQuestionVectorStore()
+    raise ValueError(f"Unknown vector store backend '{backend}', expected one of {VECTOR_STORE_BACKENDS}")
+
+# Process-wide registry of vector stores, shared by every Streamlit session
+_vector_stores = {}
+_vector_stores_lock = threading.Lock()
+
+def get_vector_store(backend: Optional[str] = None):
+    """Return the shared question vector store, creating it on first use
+
+    Args:
+        backend: "chroma" or "numpy", defaults to the VECTOR_STORE_BACKEND
+            environment variable
+    """
+    backend = backend or os.environ.get("VECTOR_STORE_BACKEND", "chroma")
+    store = _vector_stores.get(backend)
+    if store is None:
+        with _vector_stores_lock:
+            store = _vector_stores.get(backend)
+            if store is None:
+                store = create_question_vector_store(backend)
+                store.start_embedding_backfill()
+                _vector_stores[backend] = store
+    return store
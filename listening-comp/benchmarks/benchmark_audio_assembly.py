@@ -0,0 +1,169 @@
+"""
+Compare the previous ffmpeg-per-segment audio assembly with in-process assembly.
+
+Builds a question from synthetic speech segments laid out with long and
+short pauses, like AudioGenerator.generate_audio, and assembles it:
+
+- ffmpeg: every MP3 segment converted to WAV by its own ffmpeg process in a
+  temporary directory, then joined by one more ffmpeg concat process
+- inprocess: LINEAR16 segments decoded and concatenated as NumPy int16
+  buffers, then written with a single encoder pass (or no subprocess for WAV)
+
+Each variant runs in a fresh interpreter so the reported peak memory
+(resident set of the interpreter and of its ffmpeg children) is its own.
+ffmpeg is needed for MP3 output and for the previous pipeline.
+
+Usage:
+    python benchmarks/benchmark_audio_assembly.py --parts 15 --repeat 5
+    python benchmarks/benchmark_audio_assembly.py --format wav
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from backend.audio_assembly import SAMPLE_RATE, concatenate, decode_wav, silence, write_audio
+
+def synthetic_segments(parts, seed=0):
+    """WAV bytes of speech-length tones, as LINEAR16 synthesis returns them"""
+    rng = np.random.default_rng(seed)
+    segments = []
+    for _ in range(parts):
+        seconds = rng.uniform(1.5, 4.0)
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        signal = 0.3 * np.sin(2 * np.pi * rng.uniform(120, 240) * t) + 0.05 * rng.standard_normal(len(t))
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes((signal * 32767).astype('<i2').tobytes())
+        segments.append(buffer.getvalue())
+    return segments
+
+def layout(parts):
+    """Part indexes and pauses in the order generate_audio lays them out"""
+    order = [0, 'long']
+    for i in range(1, parts - 1):
+        order += [i, 'short']
+    return order + ['long', parts - 1]
+
+def assemble_inprocess(segments, order, output_file):
+    samples = [decode_wav(segment) for segment in segments]
+    pauses = {'long': silence(2000), 'short': silence(500)}
+    write_audio(concatenate([pauses[item] if item in pauses else samples[item] for item in order]), output_file)
+
+def prepare_mp3_inputs(segments, directory):
+    """Encode the segments and pauses to MP3 files, the previous pipeline's input"""
+    files = []
+    for i, segment in enumerate(segments):
+        path = os.path.join(directory, f"part_{i}.mp3")
+        write_audio(decode_wav(segment), path)
+        files.append(path)
+    pauses = {}
+    for name, duration_ms in (('long', 2000), ('short', 500)):
+        pauses[name] = os.path.join(directory, f"silence_{duration_ms}ms.mp3")
+        write_audio(silence(duration_ms), pauses[name])
+    return files, pauses
+
+def assemble_ffmpeg(files, pauses, order, output_file):
+    """The previous combine_audio_files: normalize each input to WAV, then concat"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        inputs = []
+        for i, item in enumerate(order):
+            source = pauses[item] if item in pauses else files[item]
+            normalized = os.path.join(temp_dir, f"norm_{i}.wav")
+            subprocess.run([
+                'ffmpeg', '-y', '-loglevel', 'error', '-i', source,
+                '-acodec', 'pcm_s16le', '-ar', '22050', '-ac', '1', normalized
+            ], check=True)
+            inputs += ['-i', normalized]
+        filter_complex = ''.join(f'[{i}:0]' for i in range(len(order))) + f"concat=n={len(order)}:v=0:a=1[out]"
+        subprocess.run(
+            ['ffmpeg', '-y', '-loglevel', 'error'] + inputs +
+            ['-filter_complex', filter_complex, '-map', '[out]', output_file],
+            check=True
+        )
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def run_variant(variant, parts, repeat, output_format):
+    """Time one variant in this process and print its measurements as JSON"""
+    segments = synthetic_segments(parts)
+    order = layout(parts)
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, f"question.{output_format}")
+        if variant == 'ffmpeg':
+            files, pauses = prepare_mp3_inputs(segments, tmp)
+            run = lambda: assemble_ffmpeg(files, pauses, order, output_file)
+            processes = len(order) + 1
+        else:
+            run = lambda: assemble_inprocess(segments, order, output_file)
+            processes = 0 if output_format == 'wav' else 1
+
+        # Peak memory is measured from here on, input preparation is excluded
+        base_self = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        print(json.dumps({
+            "seconds": float(np.median(timings)),
+            "peak_self_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "peak_self_growth_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_self,
+            "peak_child_kib": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+            "processes": processes,
+            "bytes": os.path.getsize(output_file)
+        }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--parts', type=int, default=15, help="Speech segments per question")
+    parser.add_argument('--repeat', type=int, default=5, help="Assemblies timed per variant")
+    parser.add_argument('--format', default='mp3', choices=['mp3', 'wav'], help="Output format")
+    parser.add_argument('--run', default=None, choices=['ffmpeg', 'inprocess'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_variant(args.run, args.parts, args.repeat, args.format)
+        return
+
+    has_ffmpeg = shutil.which('ffmpeg') is not None
+    variants = ['ffmpeg', 'inprocess'] if has_ffmpeg else ['inprocess']
+    if not has_ffmpeg:
+        if args.format == 'mp3':
+            print("ffmpeg not found, MP3 output and the previous pipeline need it")
+            return
+        print("ffmpeg not found, only the in-process WAV assembly is measured")
+    print(f"{args.parts} segments, {len(layout(args.parts))} inputs including pauses, {args.format} output\n")
+
+    results = {}
+    for variant in variants:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run', variant, '--parts', str(args.parts),
+             '--repeat', str(args.repeat), '--format', args.format],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results[variant] = json.loads(output.strip().splitlines()[-1])
+        result = results[variant]
+        print(f"[{variant}] {result['seconds'] * 1000:.0f} ms median, {result['processes']} subprocess(es), "
+              f"peak RSS {result['peak_self_kib'] / 1024:.1f} MiB (+{result['peak_self_growth_kib'] / 1024:.1f} MiB "
+              f"while assembling), largest child {result['peak_child_kib'] / 1024:.1f} MiB, "
+              f"output {result['bytes'] / 1024:.0f} KiB")
+
+    if len(results) == 2:
+        print(f"\nin-process assembly is {results['ffmpeg']['seconds'] / results['inprocess']['seconds']:.1f}x faster")
+
+if __name__ == "__main__":
+    main()
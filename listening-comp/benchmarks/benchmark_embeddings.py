@@ -0,0 +1,120 @@
+"""
+Compare embedding backends on the stored question bank.
+
+Reports embedding latency for each backend and, when a reference backend
+is available, recall@k of the candidate backend's nearest neighbours
+against the reference backend's nearest neighbours.
+
+Usage:
+    python benchmarks/benchmark_embeddings.py --reference bedrock --candidate local --k 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from backend.vector_store import build_question_document, create_embedding_function
+
+DEFAULT_QUESTIONS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "backend", "data", "stored_questions.json"
+)
+
+def load_corpus(questions_file):
+    """Load (document, query) pairs from the stored questions file"""
+    with open(questions_file, 'r', encoding='utf-8') as f:
+        stored_questions = json.load(f)
+
+    documents, queries = [], []
+    for qdata in stored_questions.values():
+        question = qdata.get('question') or {}
+        section_num = 2 if qdata.get('practice_type') == "Dialogue Practice" else 3
+        documents.append(build_question_document(section_num, question))
+        # Query with the question text, the way a learner-facing lookup would
+        queries.append(question.get('Question', '') or qdata.get('topic', ''))
+    return documents, queries
+
+def embed_timed(embedding_fn, texts, batch_size):
+    """Embed texts in batches, returning normalized vectors and elapsed seconds"""
+    start = time.perf_counter()
+    vectors = []
+    for offset in range(0, len(texts), batch_size):
+        vectors.extend(embedding_fn(texts[offset:offset + batch_size]))
+    elapsed = time.perf_counter() - start
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms, elapsed
+
+def query_latency(embedding_fn, queries, samples=20):
+    """Measure single-query embedding latency in milliseconds"""
+    timings = []
+    for query in queries[:samples]:
+        start = time.perf_counter()
+        embedding_fn([query])
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings)) if timings else 0.0
+
+def top_k(query_vectors, doc_vectors, k):
+    """Return the indices of the k most similar documents for each query"""
+    scores = query_vectors @ doc_vectors.T
+    k = min(k, doc_vectors.shape[0])
+    return np.argsort(-scores, axis=1)[:, :k]
+
+def recall_at_k(reference, candidate):
+    """Average overlap between reference and candidate neighbour sets"""
+    overlaps = [
+        len(set(ref_row) & set(cand_row)) / len(ref_row)
+        for ref_row, cand_row in zip(reference.tolist(), candidate.tolist())
+    ]
+    return float(np.mean(overlaps)) if overlaps else 0.0
+
+def benchmark_backend(name, documents, queries, batch_size):
+    """Embed the corpus with one backend and print its latency figures"""
+    embedding_fn = create_embedding_function(name)
+    doc_vectors, doc_seconds = embed_timed(embedding_fn, documents, batch_size)
+    query_vectors, _ = embed_timed(embedding_fn, queries, batch_size)
+    print(f"[{name}] embedded {len(documents)} documents in {doc_seconds:.3f}s "
+          f"({len(documents) / max(doc_seconds, 1e-9):.1f} docs/s)")
+    print(f"[{name}] median single-query latency: {query_latency(embedding_fn, queries):.2f} ms")
+    return doc_vectors, query_vectors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', default=DEFAULT_QUESTIONS_FILE, help="Path to stored_questions.json")
+    parser.add_argument('--reference', default='bedrock', help="Backend treated as ground truth")
+    parser.add_argument('--candidate', default='local', help="Backend being evaluated")
+    parser.add_argument('--k', type=int, default=5, help="Neighbourhood size for recall@k")
+    parser.add_argument('--batch-size', type=int, default=64)
+    args = parser.parse_args()
+
+    documents, queries = load_corpus(args.questions)
+    if not documents:
+        print(f"No stored questions found in {args.questions}")
+        return
+    print(f"Loaded {len(documents)} questions from {args.questions}\n")
+
+    cand_docs, cand_queries = benchmark_backend(args.candidate, documents, queries, args.batch_size)
+
+    try:
+        ref_docs, ref_queries = benchmark_backend(args.reference, documents, queries, args.batch_size)
+    except Exception as e:
+        print(f"[{args.reference}] unavailable, skipping recall comparison: {str(e)}")
+        return
+
+    if not np.any(ref_docs):
+        print(f"[{args.reference}] returned only fallback vectors, skipping recall comparison")
+        return
+
+    recall = recall_at_k(
+        top_k(ref_queries, ref_docs, args.k),
+        top_k(cand_queries, cand_docs, args.k)
+    )
+    print(f"\nrecall@{args.k} of {args.candidate} against {args.reference}: {recall:.3f}")
+
+if __name__ == "__main__":
+    main()
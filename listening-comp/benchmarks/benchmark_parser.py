@@ -0,0 +1,124 @@
+"""
+Replay recorded question responses through the question parser.
+
+Reports the parse success rate (questions that pass is_valid_question) and
+throughput of the tolerant parser, next to the line prefix parser it
+replaced, and checks that feeding each response in small chunks, as
+streaming does, gives the same question. Failures are listed by case.
+
+The corpus is a JSON lines file of {"section", "format", "response"}
+records, optionally with a "case" label and the "options" the parse must
+return exactly. Set QUESTION_RESPONSE_LOG to a file while generating
+questions to record more responses.
+
+Usage:
+    python benchmarks/benchmark_parser.py
+    python benchmarks/benchmark_parser.py --corpus recorded_responses.jsonl --repeat 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.question_generator import is_valid_question
+from backend.question_parser import IncrementalQuestionParser, parse_question
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "question_responses.jsonl")
+
+def load_responses(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def prefix_parse(response):
+    """The previous parser: exact "Header:" prefixes and "N." options only"""
+    question = {}
+    current_key = None
+    current_value = []
+    headers = ['Introduction:', 'Conversation:', 'Situation:', 'Question:', 'Options:', 'Correct Answer:']
+    for line in response.strip().split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        header = next((header for header in headers if line.startswith(header)), None)
+        if header:
+            if current_key:
+                question[current_key] = current_value if current_key == 'Options' else ' '.join(current_value)
+            current_key = header[:-1].replace(' ', '')
+            current_value = [] if current_key == 'Options' else [line.replace(header, '').strip()]
+        elif current_key == 'Options' and len(line) > 1 and line[0].isdigit() and line[1] == '.':
+            current_value.append(line[2:].strip())
+        elif current_key:
+            current_value.append(line)
+    if current_key:
+        question[current_key] = current_value if current_key == 'Options' else ' '.join(current_value)
+    if 'CorrectAnswer' in question:
+        digits = ''.join(char for char in question['CorrectAnswer'] if char.isdigit())[:1]
+        question['CorrectAnswer'] = int(digits) if digits in ('1', '2', '3', '4') else None
+    return question
+
+def stream_parse(response, chunk_size=7):
+    """Feed a response in small pieces, the way streamed deltas arrive"""
+    sections = {}
+    parser = IncrementalQuestionParser(lambda key, value: sections.setdefault(key, value))
+    for start in range(0, len(response), chunk_size):
+        parser.feed(response[start:start + chunk_size])
+    question = parser.finish()
+    return question, sections
+
+def evaluate(name, parse_fn, records, repeat):
+    failures = []
+    for record in records:
+        question = parse_fn(record['response'])
+        if not is_valid_question(record['section'], question) or (
+                'options' in record and question.get('Options') != record['options']):
+            failures.append(record.get('case', record['response'][:40]))
+
+    total_bytes = sum(len(record['response'].encode('utf-8')) for record in records) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for record in records:
+            parse_fn(record['response'])
+    seconds = time.perf_counter() - start
+
+    parsed = len(records) - len(failures)
+    print(f"[{name}] parsed {parsed}/{len(records)} ({parsed / len(records):.1%}), "
+          f"{len(records) * repeat / seconds:,.0f} responses/s, {total_bytes / seconds / (1 << 20):.1f} MiB/s")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help="JSON lines file of recorded responses")
+    parser.add_argument('--repeat', type=int, default=100, help="Passes over the corpus for the throughput figure")
+    args = parser.parse_args()
+
+    records = load_responses(args.corpus)
+    if not records:
+        print(f"No responses found in {args.corpus}")
+        return
+    formats = sorted({record.get('format', 'text') for record in records})
+    print(f"{len(records)} responses ({', '.join(formats)}) from {args.corpus}\n")
+
+    prefix_failures = evaluate("prefix", prefix_parse, records, args.repeat)
+    tolerant_failures = evaluate("tolerant", parse_question, records, args.repeat)
+
+    # Chunk sizes put the chunk boundaries at different places in each field
+    mismatches = []
+    for record in records:
+        expected = parse_question(record['response'])
+        for chunk_size in (1, 5, 7):
+            question, sections = stream_parse(record['response'], chunk_size)
+            if question != expected or sections != question:
+                mismatches.append(record.get('case', record['response'][:40]))
+                break
+    print(f"\nstreamed parse matches the single pass for {len(records) - len(mismatches)}/{len(records)} responses")
+
+    for name, failures in (("prefix", prefix_failures), ("tolerant", tolerant_failures), ("streamed", mismatches)):
+        if failures:
+            print(f"\n{name} failures:")
+            for case in sorted(set(failures)):
+                print(f"  {case} x{failures.count(case)}")
+
+if __name__ == "__main__":
+    main()
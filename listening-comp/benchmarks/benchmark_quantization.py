@@ -0,0 +1,111 @@
+"""
+Compare the float32 and int8 quantized NumPy question indexes.
+
+Builds both index variants over the same vectors and reports the bytes
+scanned per query for 10k questions, median query latency and recall@k of
+the quantized index against the unquantized one. Vectors are clustered
+synthetic embeddings by default, or the stored questions embedded with a
+backend when --questions is given.
+
+Usage:
+    python benchmarks/benchmark_quantization.py --size 10000 --dim 1536 --k 5
+    python benchmarks/benchmark_quantization.py --questions backend/data/stored_questions.json --backend local
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from backend.numpy_index import NumpyVectorIndex
+from backend.vector_store import create_embedding_function
+from benchmark_embeddings import embed_timed, load_corpus, recall_at_k
+
+def synthetic_corpus(size, dim, n_queries, clusters=64, seed=0):
+    """Clustered unit vectors, roughly how topic-grouped questions spread out"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    assignments = rng.integers(0, clusters, size=size)
+    documents = centers[assignments] + 0.8 * rng.standard_normal((size, dim)).astype(np.float32)
+    picks = rng.choice(size, n_queries, replace=False)
+    queries = documents[picks] + 0.5 * rng.standard_normal((n_queries, dim)).astype(np.float32)
+    return documents, queries
+
+def build_index(directory, vectors, quantization, ivf_threshold, rerank_factor, batch_size=1024):
+    index = NumpyVectorIndex(
+        directory, ivf_threshold=ivf_threshold,
+        quantization=quantization, rerank_factor=rerank_factor
+    )
+    for start in range(0, len(vectors), batch_size):
+        chunk = vectors[start:start + batch_size]
+        ids = [str(start + offset) for offset in range(len(chunk))]
+        index.add(ids, chunk, [{} for _ in ids])
+    return index
+
+def run_queries(index, queries, k):
+    """Return (top-k row ids per query, median latency in ms)"""
+    results, timings = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = index.search(query, k)
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append([int(id_) for id_, _, _ in hits])
+    return np.asarray(results), float(np.median(timings))
+
+def scanned_bytes_per_row(quantization, dim):
+    """Bytes each stored question contributes to the structures scanned per query"""
+    if quantization == "int8":
+        return dim + 4  # int8 codes plus a float32 scale
+    return dim * 4
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=10000, help="Number of synthetic vectors")
+    parser.add_argument('--dim', type=int, default=1536, help="Synthetic vector dimension")
+    parser.add_argument('--queries', type=int, default=200, help="Number of queries")
+    parser.add_argument('--questions', default=None, help="Embed this stored_questions.json instead of synthetic data")
+    parser.add_argument('--backend', default='local', help="Embedding backend used with --questions")
+    parser.add_argument('--k', type=int, default=5, help="Neighbourhood size for recall@k")
+    parser.add_argument('--rerank-factor', type=int, default=4, help="Shortlist size per result re-ranked in float32")
+    parser.add_argument('--ivf-threshold', type=int, default=1 << 30,
+                        help="Index size that switches to IVF (disabled by default to isolate quantization)")
+    args = parser.parse_args()
+
+    if args.questions:
+        documents, queries = load_corpus(args.questions)
+        if not documents:
+            print(f"No stored questions found in {args.questions}")
+            return
+        embedding_fn = create_embedding_function(args.backend)
+        doc_vectors, _ = embed_timed(embedding_fn, documents, 64)
+        query_vectors, _ = embed_timed(embedding_fn, queries[:args.queries], 64)
+    else:
+        doc_vectors, query_vectors = synthetic_corpus(args.size, args.dim, min(args.queries, args.size))
+
+    dim = doc_vectors.shape[1]
+    print(f"{len(doc_vectors)} vectors of dimension {dim}, {len(query_vectors)} queries\n")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for quantization in ("none", "int8"):
+            start = time.perf_counter()
+            index = build_index(
+                os.path.join(tmp, quantization), doc_vectors, quantization,
+                args.ivf_threshold, args.rerank_factor
+            )
+            build_seconds = time.perf_counter() - start
+            neighbours, latency = run_queries(index, query_vectors, args.k)
+            results[quantization] = neighbours
+
+            per_10k = scanned_bytes_per_row(quantization, dim) * 10000 / (1 << 20)
+            print(f"[{quantization}] built in {build_seconds:.2f}s, "
+                  f"{per_10k:.1f} MiB scanned per 10k questions, "
+                  f"median query latency {latency:.2f} ms")
+
+    recall = recall_at_k(results["none"], results["int8"])
+    print(f"\nrecall@{args.k} of int8 (rerank x{args.rerank_factor}) against float32: {recall:.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,49 @@
 """
 Service for generating and managing questions
 """
+import logging
+import os
+import threading
 import streamlit as st
+from backend.question_buffer import QuestionBuffer
 from backend.question_generator import QuestionGenerator
-from backend.vector_store import QuestionVectorStore
-from services.storage_service import save_question
+from backend.vector_store import get_vector_store
+from config import TOPICS, get_data_path
+from services.storage_service import save_question, update_question_explanations
 
-def generate_new_question(practice_type, topic):
+logger = logging.getLogger(__name__)
+
+# Set once the topic warm-up has been started in this process
+_warm_up_started = threading.Event()
+
+# Process-wide buffer of pre-generated questions, shared by every session
+_question_buffer = None
+_question_buffer_lock = threading.Lock()
+
+def generate_new_question(practice_type, topic, on_section=None):
     """
     Generate a new question based on practice type and topic
     
     Args:
         practice_type (str): The type of practice (e.g., "Dialogue Practice")
         topic (str): The topic for the question
+        on_section (callable, optional): Called with (section name, value) as
+            each section of a freshly generated question is streamed in
         
     Returns:
         dict: The generated question object
     """
     # Determine the section number based on practice type
-    section_num = 2 if practice_type == "Dialogue Practice" else 3
+    section_num = _section_for(practice_type)
     
-    # Generate the question
-    question_generator = _get_question_generator()
-    new_question = question_generator.generate_similar_question(section_num, topic)
+    # Serve a pre-generated question when one is ready, generate otherwise
+    new_question = None
+    question_buffer = get_question_buffer()
+    if question_buffer is not None:
+        new_question = question_buffer.pop(practice_type, topic)
+    if new_question is None:
+        question_generator = _get_question_generator()
+        new_question = question_generator.generate_similar_question(section_num, topic, on_section)
     
     # Update session state
     st.session_state.current_question = new_question
@@ -35,11 +56,50 @@ def generate_new_question(practice_type, topic):
     question_id = save_question(new_question, practice_type, topic)
     
     # Also save to vector store for future retrieval
-    vector_store = QuestionVectorStore()
-    vector_store.add_question(section_num, new_question, question_id)
+    vector_store = get_vector_store()
+    vector_store.add_question(section_num, new_question, question_id, topic=topic)
+    
+    # Buffered questions come with their explanations, fresh ones get them
+    # in the background while the learner reads the question
+    if 'Explanations' not in new_question:
+        _explain_in_background(new_question, question_id)
     
     return new_question
 
+def _explain_in_background(question, question_id):
+    """
+    Precompute the per-option explanations of a saved question in a daemon thread
+    
+    The explanations are stored with the saved question first and only
+    then added to the question object itself, so the session's current
+    question picks them up without ever differing from the stored copy
+    half-way through.
+    """
+    question_generator = _get_question_generator()
+    
+    def run():
+        try:
+            explanations = question_generator.generate_explanations(question)
+            if explanations:
+                update_question_explanations(question_id, explanations, question=question)
+        except Exception as e:
+            logger.warning(f"Precomputing explanations failed: {str(e)}")
+    
+    threading.Thread(target=run, name="question-explanations", daemon=True).start()
+
+def _with_explanations(question_generator, questions):
+    """
+    Attach precomputed per-option explanations to generated questions
+    
+    Questions whose explanations could not be generated are kept, their
+    answers are explained on demand instead.
+    """
+    for question in questions:
+        explanations = question_generator.generate_explanations(question)
+        if explanations:
+            question['Explanations'] = explanations
+    return questions
+
 def get_question_feedback(question, selected_answer):
     """
     Get feedback for a selected answer
@@ -54,6 +114,118 @@ def get_question_feedback(question, selected_answer):
     question_generator = _get_question_generator()
     return question_generator.get_feedback(question, selected_answer)
 
+def get_answer_explanation(question, selected_answer):
+    """
+    Get the explanation for an answer that was checked locally
+    
+    Args:
+        question (dict): The question object
+        selected_answer (int): The selected answer index
+        
+    Returns:
+        str: Explanation text, or None if it could not be generated
+    """
+    question_generator = _get_question_generator()
+    return question_generator.get_explanation(question, selected_answer)
+
+def warm_up_topic_embeddings():
+    """
+    Embed every configured topic once per process, in the background
+
+    The topics are the queries generate_new_question searches with, so their
+    vectors are pinned in the shared vector store and the first question a
+    user generates does not wait on the embedding backend.
+    """
+    if _warm_up_started.is_set():
+        return
+    _warm_up_started.set()
+    
+    topics = [topic for practice_topics in TOPICS.values() for topic in practice_topics]
+    
+    def run():
+        try:
+            pinned = get_vector_store().warm_up(topics)
+            logger.info(f"Pinned embeddings for {pinned} of {len(topics)} topics")
+        except Exception as e:
+            logger.warning(f"Topic embedding warm-up failed: {str(e)}")
+    
+    threading.Thread(target=run, name="topic-warm-up", daemon=True).start()
+
+def seed_questions(practice_type, topic, n):
+    """
+    Generate a batch of questions for a topic and store them all
+    
+    Args:
+        practice_type (str): The type of practice
+        topic (str): The topic for the questions
+        n (int): Number of questions to request
+        
+    Returns:
+        list: The questions that passed validation and were stored
+    """
+    section_num = _section_for(practice_type)
+    question_generator = _get_question_generator()
+    questions = _with_explanations(question_generator, question_generator.generate_batch(section_num, topic, n))
+    
+    # Each question is saved under its own ID, then indexed as one batch
+    records = [(save_question(question, practice_type, topic), question, topic) for question in questions]
+    dropped = get_vector_store().add_records(section_num, records) if records else 0
+    
+    logger.info(
+        f"Seeded {len(questions)} of {n} requested questions for {practice_type} - {topic}, "
+        f"{len(questions) - dropped} indexed, {dropped} dropped as near-duplicates"
+    )
+    return questions
+
+def _section_for(practice_type):
+    return 2 if practice_type == "Dialogue Practice" else 3
+
+def get_question_buffer():
+    """
+    Get the shared question buffer, creating it on first use
+    
+    The buffer size per (practice type, topic) pair comes from the
+    QUESTION_BUFFER_SIZE environment variable. It defaults to 0, which
+    disables buffering, since every buffered question costs a model call.
+    
+    Returns:
+        QuestionBuffer: The buffer, or None when disabled
+    """
+    global _question_buffer
+    capacity = int(os.environ.get("QUESTION_BUFFER_SIZE", 0))
+    if capacity <= 0:
+        return None
+    
+    with _question_buffer_lock:
+        if _question_buffer is None:
+            # The producer threads share one generator, boto3 clients are thread-safe
+            generator = QuestionGenerator()
+            
+            def produce(practice_type, topic, count):
+                # One batch call fills every missing slot of the pair, then
+                # each question gets its explanations before it is served
+                questions = generator.generate_batch(_section_for(practice_type), topic, count)
+                return _with_explanations(generator, questions)
+            
+            _question_buffer = QuestionBuffer(
+                produce,
+                os.path.join(get_data_path(), "question_buffer.json"),
+                capacity=capacity
+            )
+        return _question_buffer
+
+def start_question_buffer():
+    """
+    Start the question buffer workers when buffering is enabled
+    
+    No pair is pre-generated up front, a (practice type, topic) pair is
+    buffered once a question for it has been requested.
+    """
+    question_buffer = get_question_buffer()
+    if question_buffer is None:
+        return
+    question_buffer.start([])
+
 def _get_question_generator():
     """
     Get or initialize the question generator
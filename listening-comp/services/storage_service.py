@@ -3,9 +3,15 @@ Service for storing and retrieving questions
 """
 import os
 import json
+import threading
+import uuid
 from datetime import datetime
 from config import get_questions_file_path, get_data_path
 
+# Serializes read-modify-write cycles on the questions file, explanations
+# are stored from a background thread
+_questions_file_lock = threading.RLock()
+
 def load_stored_questions():
     """
     Load previously stored questions from JSON file
@@ -39,26 +45,28 @@ def save_question(question, practice_type, topic, audio_file=None):
     Returns:
         str: The question ID
     """
-    # Load existing questions
-    stored_questions = load_stored_questions()
-    
-    # Create a unique ID for the question using timestamp
-    question_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    # Add metadata
-    question_data = {
-        "question": question,
-        "practice_type": practice_type,
-        "topic": topic,
-        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "audio_file": audio_file
-    }
-    
-    # Add to stored questions
-    stored_questions[question_id] = question_data
-    
-    # Save back to file
-    _save_questions_to_file(stored_questions)
+    with _questions_file_lock:
+        # Load existing questions
+        stored_questions = load_stored_questions()
+        
+        # Create a unique ID for the question, a timestamp keeps IDs sortable
+        # and the random suffix separates questions saved in the same second
+        question_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        
+        # Add metadata
+        question_data = {
+            "question": question,
+            "practice_type": practice_type,
+            "topic": topic,
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "audio_file": audio_file
+        }
+        
+        # Add to stored questions
+        stored_questions[question_id] = question_data
+        
+        # Save back to file
+        _save_questions_to_file(stored_questions)
     
     return question_id
 
@@ -75,22 +83,48 @@ def update_question_audio(question, practice_type, topic, audio_file):
     Returns:
         bool: True if successful, False otherwise
     """
-    # Load existing questions
-    stored_questions = load_stored_questions()
-    
-    # Find the question by matching content
-    # This is a simplistic approach - in production, use a more robust ID system
-    for qid, qdata in stored_questions.items():
-        if qdata["question"] == question and qdata["practice_type"] == practice_type and qdata["topic"] == topic:
-            # Update audio file
-            stored_questions[qid]["audio_file"] = audio_file
-            _save_questions_to_file(stored_questions)
-            return True
-    
-    # If not found, save as a new question
-    save_question(question, practice_type, topic, audio_file)
+    with _questions_file_lock:
+        # Load existing questions
+        stored_questions = load_stored_questions()
+        
+        # Find the question by matching content
+        # This is a simplistic approach - in production, use a more robust ID system
+        for qid, qdata in stored_questions.items():
+            if qdata["question"] == question and qdata["practice_type"] == practice_type and qdata["topic"] == topic:
+                # Update audio file
+                stored_questions[qid]["audio_file"] = audio_file
+                _save_questions_to_file(stored_questions)
+                return True
+        
+        # If not found, save as a new question
+        save_question(question, practice_type, topic, audio_file)
     return False
 
+def update_question_explanations(question_id, explanations, question=None):
+    """
+    Store the precomputed per-option explanations of a saved question
+    
+    Args:
+        question_id (str): The ID returned by save_question
+        explanations (list): One explanation per option, in option order
+        question (dict, optional): The in-memory question object, given the
+            explanations once they are stored, while the file lock is held,
+            so content matches in update_question_audio see it either before
+            or after the update, never half-way
+        
+    Returns:
+        bool: True if the question was found, False otherwise
+    """
+    with _questions_file_lock:
+        stored_questions = load_stored_questions()
+        if question_id not in stored_questions:
+            return False
+        stored_questions[question_id]["question"]["Explanations"] = explanations
+        _save_questions_to_file(stored_questions)
+        if question is not None:
+            question['Explanations'] = explanations
+    return True
+
 def _save_questions_to_file(questions_data):
     """
     Save questions data to the JSON file
@@ -3,7 +3,7 @@ Practice section UI component for question generation and answering
 """
 import streamlit as st
 from config import PRACTICE_TYPES, TOPICS
-from services.question_service import generate_new_question, get_question_feedback
+from services.question_service import generate_new_question, get_question_feedback, get_answer_explanation
 from ui.audio_player import render_audio_player
 
 def render_practice_section():
@@ -22,8 +22,11 @@ def render_practice_section():
     
     # Generate new question button
     if st.button("Generate New Question"):
+        # Show each part of the question as soon as it has been generated
+        preview = st.empty()
         with st.spinner("Generating question..."):
-            generate_new_question(practice_type, topic)
+            generate_new_question(practice_type, topic, on_section=_stream_preview(preview, practice_type))
+        preview.empty()
     
     # Display current question if available
     if st.session_state.current_question:
@@ -31,6 +34,35 @@ def render_practice_section():
     else:
         st.info("Click 'Generate New Question' to start practicing!")
 
+def _stream_preview(preview, practice_type):
+    """Build a callback that re-renders the sections generated so far into a placeholder"""
+    sections = {}
+    
+    def on_section(name, value):
+        sections[name] = value
+        with preview.container():
+            st.subheader("Practice Scenario")
+            _render_question_text(practice_type, sections)
+            if 'Options' in sections:
+                st.write("**Options:**")
+                for i, option in enumerate(sections['Options'], 1):
+                    st.write(f"{i}. {option}")
+    
+    return on_section
+
+def _render_question_text(practice_type, question):
+    """Render the scenario and question text, skipping parts not generated yet"""
+    if practice_type == "Dialogue Practice":
+        fields = [('Introduction', "Introduction"), ('Conversation', "Conversation")]
+    else:
+        fields = [('Situation', "Situation")]
+    fields.append(('Question', "Question"))
+    
+    for key, label in fields:
+        if key in question:
+            st.write(f"**{label}:**")
+            st.write(question[key])
+
 def _render_current_question():
     """Render the current practice question"""
     st.subheader("Practice Scenario")
@@ -40,17 +72,7 @@ def _render_current_question():
     question = st.session_state.current_question
     
     # Display question components based on practice type
-    if practice_type == "Dialogue Practice":
-        st.write("**Introduction:**")
-        st.write(question['Introduction'])
-        st.write("**Conversation:**")
-        st.write(question['Conversation'])
-    else:
-        st.write("**Situation:**")
-        st.write(question['Situation'])
-    
-    st.write("**Question:**")
-    st.write(question['Question'])
+    _render_question_text(practice_type, question)
     
     # Create two columns for options and audio
     col1, col2 = st.columns([2, 1])
@@ -75,7 +97,9 @@ def _render_feedback(options):
     """Render feedback for submitted answer"""
     feedback = st.session_state.feedback
     correct = feedback.get('correct', False)
-    correct_answer = feedback.get('correct_answer', 1) - 1
+    # The correct option is unknown when the answer could not be judged
+    correct_answer = feedback.get('correct_answer')
+    correct_answer = correct_answer - 1 if isinstance(correct_answer, int) else None
     selected_index = st.session_state.selected_answer - 1 if hasattr(st.session_state, 'selected_answer') else -1
     
     st.write("\n**Your Answer:**")
@@ -89,9 +113,15 @@ def _render_feedback(options):
         else:
             st.write(f"{i+1}. {option}")
     
-    # Show explanation
+    # Show explanation, answers checked locally get theirs after the result is shown
     st.write("\n**Explanation:**")
-    explanation = feedback.get('explanation', 'No feedback available')
+    if 'explanation' in feedback and feedback['explanation'] is None:
+        with st.spinner("Generating explanation..."):
+            feedback['explanation'] = get_answer_explanation(
+                st.session_state.current_question,
+                st.session_state.selected_answer
+            ) or 'No feedback available'
+    explanation = feedback.get('explanation') or 'No feedback available'
     if correct:
         st.success(explanation)
     else:
@@ -117,8 +147,8 @@ def _render_options_selection(options):
         selected_index = options.index(selected) + 1
         st.session_state.selected_answer = selected_index
         
-        with st.spinner("Generating feedback..."):
-            # Get feedback for the selected answer
+        with st.spinner("Checking answer..."):
+            # Questions with an answer key are checked without a model call
             feedback = get_question_feedback(
                 st.session_state.current_question,
                 selected_index